@@ -9,3 +9,5 @@ if __name__ == "__main__":
     data = Dataset("datasets/Abalone.csv")
     # get dataset report
     print(data)
+    # missing and distinct values of each feature
+    print(data.profile.loc[["nulls", "cardinality"]])
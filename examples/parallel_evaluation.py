@@ -0,0 +1,31 @@
+import os
+
+import numpy as np
+import pandas as pd
+from niapy.algorithms.basic import DifferentialEvolution
+
+from niaarm import Dataset, get_rules
+
+# this example compares the run time of mining rules in the current process and in
+# a pool of worker processes. Every generation of differential evolution is
+# counted in a single round trip to the workers, each counting a shard of the
+# transactions, so the pool pays off on large datasets and machines with several
+# cores
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    num_transactions = 2_000_000
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, num_transactions),
+            "income": rng.lognormal(10, 1, num_transactions),
+            "city": rng.choice(["A", "B", "C", "D", "E"], num_transactions),
+            "visits": rng.poisson(3, num_transactions),
+        }
+    )
+    data = Dataset(df)
+    metrics = ("support", "confidence")
+
+    for n_jobs in sorted({1, os.cpu_count()}):
+        algo = DifferentialEvolution(population_size=50, seed=1)
+        rules, run_time = get_rules(data, algo, metrics, max_evals=1000, n_jobs=n_jobs)
+        print(f"n_jobs={n_jobs}: {len(rules)} rules in {run_time:.2f} s")
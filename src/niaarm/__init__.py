@@ -2,10 +2,24 @@ from niaarm.dataset import Dataset
 from niaarm.feature import Feature
 from niaarm.mine import get_rules
 from niaarm.niaarm import NiaARM
-from niaarm.preprocessing import squash
+from niaarm.preprocessing import discretize, squash, squash_csv, undiscretize
 from niaarm.rule import Rule
 from niaarm.rule_list import RuleList
+from niaarm.store import BlockStore, TransactionStore
 
-__all__ = ["NiaARM", "Dataset", "Feature", "Rule", "RuleList", "get_rules", "squash"]
+__all__ = [
+    "NiaARM",
+    "Dataset",
+    "Feature",
+    "Rule",
+    "RuleList",
+    "TransactionStore",
+    "BlockStore",
+    "get_rules",
+    "squash",
+    "squash_csv",
+    "discretize",
+    "undiscretize",
+]
 
 __version__ = "0.4.6"
@@ -0,0 +1,178 @@
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple("CacheInfo", ("hits", "misses", "max_bytes", "nbytes"))
+
+
+class ItemCache:
+    r"""Least recently used cache of the packed bitsets of rule items.
+
+    Metaheuristics revisit the same items (e.g. the same category or an integer
+    interval that rounds to the same bounds) very often, so the bitset of an item
+    is computed from its column only once and afterwards AND-ed from the cache.
+
+    Args:
+        max_bytes (int): Memory budget of the cached bitsets in bytes. When it is
+         exceeded, the least recently used bitsets are evicted.
+         Default: 64 MiB.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to compute the bitset.
+        nbytes (int): Memory used by the cached bitsets in bytes.
+
+    """
+
+    def __init__(self, max_bytes=64 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._data = OrderedDict()
+
+    def get(self, key, compute):
+        r"""Get the bitset of an item, computing and caching it on a miss.
+
+        Args:
+            key (Hashable): Key of the item.
+            compute (Callable[[], numpy.ndarray]): Function computing the bitset.
+
+        Returns:
+            numpy.ndarray: The bitset. It is shared and must not be modified.
+
+        """
+        bits = self._data.get(key)
+        if bits is not None:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return bits
+
+        self.misses += 1
+        bits = compute()
+        if bits.nbytes <= self.max_bytes:
+            self._data[key] = bits
+            self.nbytes += bits.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return bits
+
+    def info(self):
+        r"""Get cache statistics.
+
+        Returns:
+            CacheInfo: Hits, misses, memory budget and memory used.
+
+        """
+        return CacheInfo(self.hits, self.misses, self.max_bytes, self.nbytes)
+
+    def clear(self):
+        r"""Remove all bitsets and reset the statistics."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemoInfo(namedtuple("MemoInfo", ("hits", "misses", "max_size", "size"))):
+    """Statistics of a :class:`FitnessMemo` as a ``namedtuple``.
+
+    Attributes:
+        hits (int): Number of evaluations served from the memo table.
+        misses (int): Number of evaluations that had to count the transactions.
+        max_size (int): Maximum number of memoized rules.
+        size (int): Number of memoized rules.
+
+    """
+
+    __slots__ = ()
+
+    @property
+    def hit_rate(self):
+        """float: Fraction of evaluations served from the memo table."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class FitnessMemo:
+    r"""Bounded memo table of rule fitness values.
+
+    Many solution vectors decode to the same rule, e.g. because of category and
+    integer rounding or features switched off by their threshold, so the fitness
+    of a decoded rule is looked up here before any transactions are counted.
+
+    Args:
+        max_size (int): Maximum number of memoized rules. When it is exceeded, the
+         least recently used rules are evicted. Default: 65536.
+
+    Attributes:
+        hits (int): Number of lookups served from the memo table.
+        misses (int): Number of lookups of rules that were not memoized.
+
+    """
+
+    def __init__(self, max_size=2**16):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key):
+        r"""Look up the fitness of a rule.
+
+        Args:
+            key (Hashable): Key of the decoded rule.
+
+        Returns:
+            float | None: The memoized fitness or ``None`` if the rule is not
+            memoized.
+
+        """
+        fitness = self._data.get(key)
+        if fitness is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return fitness
+
+    def put(self, key, fitness):
+        r"""Memoize the fitness of a rule.
+
+        Args:
+            key (Hashable): Key of the decoded rule.
+            fitness (float): Fitness of the rule.
+
+        """
+        if self.max_size <= 0:
+            return
+        self._data[key] = fitness
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def info(self):
+        r"""Get memo statistics.
+
+        Returns:
+            MemoInfo: Hits, misses, maximum size and current size.
+
+        """
+        return MemoInfo(self.hits, self.misses, self.max_size, len(self._data))
+
+    def clear(self):
+        r"""Remove all memoized rules and reset the statistics."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
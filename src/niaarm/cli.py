@@ -1,8 +1,12 @@
 import argparse
+import hashlib
+import json
 import os
 import platform
+import shutil
 import subprocess
 import sys
+import tempfile
 import tomllib
 from inspect import getmembers, getmodule, isfunction
 from pathlib import Path
@@ -14,13 +18,17 @@ from niapy.util import distances, repair
 from niapy.util.factory import get_algorithm
 
 import niaarm
-from niaarm import Dataset, NiaARM, get_rules, squash
+from niaarm import Dataset, NiaARM, get_rules, squash, squash_csv
 
 DEFAULT_CONFIG = {
     "input_file": None,
+    "input_format": None,
+    "cache": True,
+    "block_size": None,
     "output_file": None,
     "log": False,
     "stats": False,
+    "n_jobs": 1,
     "preprocessing": {
         "squashing": {},
     },
@@ -53,7 +61,25 @@ def get_parser():
         "-i",
         "--input-file",
         type=str,
-        help="Input file containing a csv dataset",
+        help="Input file containing a dataset (csv, Parquet or Feather)",
+    )
+    parser.add_argument(
+        "--input-format",
+        type=str,
+        choices=("csv", "parquet", "feather"),
+        help="Format of the input file (inferred from its extension by default,"
+        " parquet and feather require pyarrow)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't cache the compiled input dataset for faster repeated runs",
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        help="Evaluate rules in blocks of this many transactions (on the"
+        " memory-mapped cached dataset, for datasets larger than the memory)",
     )
     parser.add_argument(
         "-o", "--output-file", type=str, help="Output file for mined rules"
@@ -67,6 +93,32 @@ def get_parser():
     parser.add_argument(
         "--squashing-threshold", type=float, help="Threshold to use for squashing"
     )
+    parser.add_argument(
+        "--squashing-method",
+        type=str,
+        choices=("exhaustive", "tree", "lsh"),
+        default="exhaustive",
+        help="How to find similar transactions when squashing",
+    )
+    parser.add_argument(
+        "--squashing-jobs",
+        type=int,
+        default=1,
+        help="Number of processes to squash blocks of transactions in"
+        " (-1 to use all CPUs)",
+    )
+    parser.add_argument(
+        "--squashing-partition-by",
+        type=str,
+        help="Feature whose values partition the transactions into squashing blocks",
+    )
+    parser.add_argument(
+        "--squashing-chunksize",
+        type=int,
+        help="Squash the input file in a single pass over chunks of this many"
+        " transactions, without loading it into memory (can't be combined with"
+        " --squashing-method, --squashing-jobs or --squashing-partition-by)",
+    )
     parser.add_argument(
         "-a",
         "--algorithm",
@@ -104,6 +156,13 @@ def get_parser():
         action="extend",
         help="Weights in range [0, 1] corresponding to --metrics",
     )
+    parser.add_argument(
+        "-j",
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Number of processes to evaluate rules in (-1 to use all CPUs)",
+    )
     parser.add_argument(
         "--log", action="store_true", help="Enable logging of fitness improvements"
     )
@@ -240,6 +299,66 @@ def edit_parameters(parameters, algorithm):
     return new_parameters
 
 
+def cache_dir():
+    """Get the directory compiled datasets are cached in."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "niaarm")
+
+
+def load_dataset(path, file_format=None, cache=True, block_size=None):
+    """Load a dataset, reusing its compiled copy from the cache if up to date.
+
+    The cache is keyed on the absolute path and format of the input file and
+    invalidated when the file's modification time or size changes. With a
+    ``block_size``, rules are evaluated block by block on the memory-mapped copy
+    (see :meth:`niaarm.Dataset.load_compiled`), or on the dataset in memory if
+    the cache is disabled.
+
+    """
+    if not cache:
+        return Dataset(path, file_format=file_format, block_size=block_size)
+
+    path = os.path.abspath(path)
+    key = hashlib.sha1(f"{path}\0{file_format}".encode()).hexdigest()
+    entry = os.path.join(cache_dir(), key)
+    stat = os.stat(path)
+    source = {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    try:
+        with open(os.path.join(entry, "source.json")) as f:
+            if json.load(f) == source:
+                return Dataset.load_compiled(entry, block_size=block_size)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    dataset = Dataset(path, file_format=file_format)
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        # the entry is compiled next to the cache and moved into place when it is
+        # complete, so runs that have the old entry memory-mapped keep reading it
+        staging = tempfile.mkdtemp(prefix=f".{key}.", dir=cache_dir())
+        try:
+            dataset.save_compiled(staging)
+            with open(os.path.join(staging, "source.json"), "w") as f:
+                json.dump(source, f)
+            if os.path.exists(entry):
+                stale = tempfile.mkdtemp(prefix=f".{key}.", dir=cache_dir())
+                os.replace(entry, os.path.join(stale, "entry"))
+                shutil.rmtree(stale, ignore_errors=True)
+            os.replace(staging, entry)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Couldn't cache dataset: {e}", file=sys.stderr)
+        dataset.block_size = block_size
+        return dataset
+    if block_size is not None:
+        return Dataset.load_compiled(entry, block_size=block_size)
+    return dataset
+
+
 def main():
     parser = get_parser()
     args = parser.parse_args()
@@ -257,11 +376,21 @@ def main():
             print("Error: Invalid config file", file=sys.stderr)
     else:
         config["input_file"] = args.input_file
+        config["input_format"] = args.input_format
+        config["cache"] = not args.no_cache
+        config["block_size"] = args.block_size
         config["output_file"] = args.output_file
         config["log"] = args.log
         config["stats"] = args.stats
+        config["n_jobs"] = args.n_jobs
         config["preprocessing"]["squashing"]["similarity"] = args.squashing_similarity
         config["preprocessing"]["squashing"]["threshold"] = args.squashing_threshold
+        config["preprocessing"]["squashing"]["method"] = args.squashing_method
+        config["preprocessing"]["squashing"]["n_jobs"] = args.squashing_jobs
+        config["preprocessing"]["squashing"]["partition_by"] = (
+            args.squashing_partition_by
+        )
+        config["preprocessing"]["squashing"]["chunksize"] = args.squashing_chunksize
         config["algorithm"]["name"] = args.algorithm
         config["algorithm"]["seed"] = args.seed
         config["algorithm"]["max_evals"] = args.max_evals
@@ -289,18 +418,58 @@ def main():
     weights = weights if weights else [1] * len(metrics)
     metrics = dict(zip(metrics, weights, strict=True))
 
-    try:
-        dataset = Dataset(config["input_file"])
+    squash_config = config["preprocessing"]["squashing"]
+    squashing = bool(
+        squash_config and squash_config["similarity"] and squash_config["threshold"]
+    )
+    if (
+        squashing
+        and squash_config.get("chunksize")
+        and (
+            squash_config.get("method", "exhaustive") != "exhaustive"
+            or squash_config.get("n_jobs", 1) != 1
+            or squash_config.get("partition_by")
+        )
+    ):
+        print(
+            "Error: Squashing in chunks supports only the exhaustive method,"
+            " a single job and no partition feature",
+            file=sys.stderr,
+        )
+        return 1
 
-        squash_config = config["preprocessing"]["squashing"]
-        if squash_config and squash_config["similarity"] and squash_config["threshold"]:
-            num_transactions = len(dataset.transactions)
-            dataset = squash(
-                dataset, squash_config["threshold"], squash_config["similarity"]
+    try:
+        if squashing and squash_config.get("chunksize"):
+            dataset, squash_info = squash_csv(
+                config["input_file"],
+                squash_config["threshold"],
+                squash_config["similarity"],
+                chunksize=squash_config["chunksize"],
+                max_prototypes=squash_config.get("max_prototypes", 10_000),
+                return_info=True,
             )
+        else:
+            dataset = load_dataset(
+                config["input_file"],
+                config["input_format"],
+                config["cache"],
+                config.get("block_size"),
+            )
+            if squashing:
+                dataset, squash_info = squash(
+                    dataset,
+                    squash_config["threshold"],
+                    squash_config["similarity"],
+                    squash_config.get("method", "exhaustive"),
+                    n_jobs=squash_config.get("n_jobs", 1),
+                    partition_by=squash_config.get("partition_by"),
+                    return_info=True,
+                )
+        if squashing:
             print(
                 f"Squashed dataset from"
-                f" {num_transactions} to {len(dataset.transactions)} transactions"
+                f" {squash_info.num_transactions} to {squash_info.num_clusters}"
+                f" transactions ({squash_info.pairs_compared} pairs compared)"
             )
 
         algorithm = get_algorithm(
@@ -344,6 +513,7 @@ def main():
             config["algorithm"]["max_evals"],
             config["algorithm"]["max_iters"],
             config["log"],
+            config["n_jobs"],
         )
         if config["output_file"]:
             rules.to_csv(config["output_file"])
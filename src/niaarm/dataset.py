@@ -1,78 +1,454 @@
+import json
+import os
+from functools import cached_property
+
 import numpy as np
 import pandas as pd
 from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype
 
 from niaarm.feature import Feature
+from niaarm.statistics import FeatureStatistics
+from niaarm.store import BlockStore, TransactionStore
+
+_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+
+def _read_arrow(path, file_format, columns):
+    r"""Read a Parquet or Feather (Arrow IPC) file into a DataFrame with pyarrow.
+
+    String columns are read as dictionary arrays, which pyarrow converts to
+    categorical columns without building them from Python strings.
+
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            f"Reading {file_format} files requires pyarrow (pip install niaarm[arrow])"
+        ) from e
+
+    if file_format == "parquet":
+        schema = pq.read_schema(path)
+        strings = [
+            field.name
+            for field in schema
+            if (columns is None or field.name in columns)
+            and (pa.types.is_string(field.type) or pa.types.is_large_string(field.type))
+        ]
+        table = pq.read_table(path, columns=columns, read_dictionary=strings)
+    else:
+        table = feather.read_table(path, columns=columns)
+        table = pa.table(
+            [
+                column.dictionary_encode()
+                if pa.types.is_string(column.type)
+                or pa.types.is_large_string(column.type)
+                else column
+                for column in table.columns
+            ],
+            names=table.column_names,
+        )
+    if columns is not None:
+        table = table.select(columns)
+    transactions = table.to_pandas()
+
+    # order the categories like pandas does for csv files, by remapping the codes
+    for name in transactions.columns:
+        column = transactions[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.cat.remove_unused_categories()
+            transactions[name] = column.cat.reorder_categories(
+                column.cat.categories.sort_values()
+            )
+    return transactions
+
+
+# version of the format written by Dataset.save_compiled
+_COMPILED_VERSION = 2
 
 
 class Dataset:
     r"""Class for working with a dataset.
 
+    A deduplicated or weighted dataset holds one row of ``transactions`` per
+    unique (or squashed) transaction, and only ``store`` knows the weights. Rules
+    evaluated on ``transactions`` count every row once, so their metrics are
+    wrong: pass ``store`` instead, e.g. ``Rule(antecedent, consequent,
+    transactions=dataset.store)`` or ``NiaARM(..., dataset.store, ...)``.
+    Visualizations that take a DataFrame, such as
+    :func:`~niaarm.visualize.hill_slopes`, don't support weights and should be
+    given the original transactions.
+
     Args:
-        path_or_df (str | os.PathLike | pandas.DataFrame): Path to the dataset (csv)
-        file or a pandas DataFrame.
+        path_or_df (str | os.PathLike | pandas.DataFrame): Path to the dataset (csv,
+         Parquet or Feather/Arrow IPC) file or a pandas DataFrame.
         delimiter (str): The delimiter in the csv file.
         header (int | None): Row to use as header (zero-based). Default: 0.
          Pass ``header=None`` if the file doesn't contain a header.
         names (list[str] | None): List of feature names to use.
          If the file already contains a header row, pass ``header=0`` to override the
          feature names.
+        rank_index (bool): Build a sorted-rank index of every numerical feature in
+         ``store``, so that the transactions within an interval are found by binary
+         search. Useful when intervals are narrow. Default: ``False``.
+        deduplicate (bool): Group identical transactions into unique rows weighted by
+         their multiplicities. Rule metrics computed on ``store`` stay exact, but
+         rules are evaluated on fewer rows. Default: ``False``.
+        weights (Sequence[int] | None): Number of transactions each row stands for,
+         e.g. the cluster sizes of a squashed dataset. Default: ``None``.
+        bin_edges (dict[str, numpy.ndarray] | None): Edges of the bins of features
+         discretized into bin indices, keyed by feature name. Default: ``None``.
+        file_format (str | None): Format of the file, one of ``'csv'``,
+         ``'parquet'`` or ``'feather'`` (also Arrow IPC files). If ``None``, it is
+         inferred from the file extension, defaulting to csv. Reading Parquet and
+         Feather files requires pyarrow. Default: ``None``.
+        columns (list[str] | None): Names of the features to load. Only these
+         columns are read from Parquet and Feather files. Default: ``None`` (all
+         features).
+        block_size (int | None): Evaluate rules in blocks of this many transactions
+         (see :class:`~niaarm.store.BlockStore`), so the temporary masks of an
+         evaluation only cover one block. Blocks of about 2**16 transactions fit
+         in the CPU caches. Default: ``None`` (all transactions at once).
 
     Attributes:
-        transactions (pandas.DataFrame): Transactional data.
+        transactions (pandas.DataFrame): Transactional data, one row per unique
+         transaction if the dataset is deduplicated or weighted.
         header (list[str]): Feature names.
         features (list[Feature]): List of features.
+        weights (numpy.ndarray | None): Number of transactions each row of
+         ``transactions`` stands for, or ``None`` if every row is a single
+         transaction.
+        bin_edges (dict[str, numpy.ndarray]): Edges of the bins of discretized
+         features. Bin ``i`` of a feature holds the values between its edges ``i``
+         and ``i + 1`` in the original units.
         dimension (int): Dimension of the optimization problem for the dataset.
+        block_size (int | None): Number of transactions rules are evaluated on at
+         once, or ``None`` for all of them.
+        store (TransactionStore): Columnar NumPy representation of the transactions,
+         compiled on first access. It reuses the value ranges of ``features``.
+         A :class:`~niaarm.store.BlockStore` if ``block_size`` is set.
+        profile (pandas.DataFrame): Types, value ranges, categories, missing and
+         distinct values of the features, computed on first access.
 
     """
 
-    def __init__(self, path_or_df, delimiter=",", header=0, names=None):
+    def __init__(
+        self,
+        path_or_df,
+        delimiter=",",
+        header=0,
+        names=None,
+        rank_index=False,
+        deduplicate=False,
+        weights=None,
+        bin_edges=None,
+        file_format=None,
+        columns=None,
+        block_size=None,
+    ):
         if isinstance(path_or_df, pd.DataFrame):
             self.transactions = path_or_df
+            if columns is not None:
+                self.transactions = self.transactions[columns]
         else:
-            self.transactions = pd.read_csv(
-                path_or_df, delimiter=delimiter, header=header, names=names
-            )
-            if names is None and header is None:
-                self.transactions.columns = pd.Index(
-                    [f"Feature{i}" for i in range(len(self.transactions.columns))]
+            if file_format is None:
+                extension = os.path.splitext(path_or_df)[1].lower()
+                file_format = _FORMATS.get(extension, "csv")
+            if file_format not in ("csv", "parquet", "feather"):
+                raise ValueError(f"Invalid file format: {file_format}")
+
+            if file_format == "csv":
+                self.transactions = pd.read_csv(
+                    path_or_df, delimiter=delimiter, header=header, names=names
                 )
+                if names is None and header is None:
+                    self.transactions.columns = pd.Index(
+                        [f"Feature{i}" for i in range(len(self.transactions.columns))]
+                    )
+                if columns is not None:
+                    self.transactions = self.transactions[columns]
+            else:
+                self.transactions = _read_arrow(path_or_df, file_format, columns)
         self.header = self.transactions.columns.tolist()
+        self.rank_index = rank_index
+        self.block_size = block_size
         self.features = []
         self.__extract_features()
+        self.weights = None
+        if weights is not None:
+            self.weights = np.asarray(weights, dtype=np.int64)
+            if self.weights.shape != (len(self.transactions),):
+                raise ValueError(
+                    f"Number of weights ({self.weights.size}) does not match the"
+                    f" number of transactions ({len(self.transactions)})"
+                )
+        self.bin_edges = dict(bin_edges) if bin_edges is not None else {}
+        if deduplicate:
+            self.__deduplicate()
         self.dimension = self.__problem_dimension()
 
     def __extract_features(self):
-        r"""Extract data types for the data in a dataset."""
-        for head in self.header:
-            col = self.transactions[head]
-
-            if is_float_dtype(col):
-                dtype = "float"
-                min_value = col.min()
-                max_value = col.max()
-                unique_categories = None
-            elif is_integer_dtype(col):
-                dtype = "int"
-                min_value = col.min()
-                max_value = col.max()
-                unique_categories = None
-            elif is_bool_dtype(col):
+        r"""Extract data types for the data in a dataset.
+
+        The value ranges are reduced over all numerical columns of the same dtype
+        at once rather than column by column."""
+        kinds = {}
+        for head, dtype in self.transactions.dtypes.items():
+            if is_float_dtype(dtype):
+                kinds[head] = "float"
+            elif is_integer_dtype(dtype):
+                kinds[head] = "int"
+            elif is_bool_dtype(dtype):
                 self.transactions[head] = self.transactions[head].astype(int)
-                dtype = "int"
-                min_value = 0
-                max_value = 1
-                unique_categories = None
+                kinds[head] = "bool"
             else:
-                dtype = "cat"
                 self.transactions[head] = self.transactions[head].astype("category")
-                unique_categories = self.transactions[head].cat.categories.tolist()
-                min_value = None
-                max_value = None
+                kinds[head] = "cat"
+
+        groups = {}
+        dtypes = self.transactions.dtypes
+        for head, kind in kinds.items():
+            if kind in ("float", "int"):
+                groups.setdefault(dtypes[head], []).append(head)
+        min_values = {}
+        max_values = {}
+        for heads in groups.values():
+            columns = self.transactions[heads]
+            minimum = columns.min()
+            maximum = columns.max()
+            for head in heads:
+                min_values[head] = minimum[head]
+                max_values[head] = maximum[head]
+
+        for head, kind in kinds.items():
+            if kind == "cat":
+                categories = self.transactions[head].cat.categories.tolist()
+                feature = Feature(head, "cat", categories=categories)
+            elif kind == "bool":
+                feature = Feature(head, "int", 0, 1)
+            else:
+                feature = Feature(head, kind, min_values[head], max_values[head])
+            self.features.append(feature)
+
+    def __deduplicate(self):
+        r"""Group identical transactions into unique rows with multiplicity weights."""
+        groups = self.transactions.groupby(
+            self.header, dropna=False, sort=False, observed=True
+        ).ngroup()
+        first = ~groups.duplicated().to_numpy()
+        self.weights = np.bincount(groups.to_numpy(), self.weights).astype(np.int64)
+        self.transactions = self.transactions[first].reset_index(drop=True)
+
+    @cached_property
+    def store(self):
+        store = TransactionStore(
+            self.transactions,
+            FeatureStatistics.from_features(self.features),
+            rank_index=self.rank_index and self.block_size is None,
+            weights=self.weights,
+        )
+        if self.block_size is None:
+            return store
+        return BlockStore(
+            store.columns,
+            store.categories,
+            store.statistics,
+            store.weights,
+            self.block_size,
+        )
+
+    @cached_property
+    def profile(self):
+        """pandas.DataFrame: Summary of the features, computed on first access.
+
+        The columns are the features and the rows are their ``dtype``, value
+        range (``min_val``, ``max_val``), ``categories``, number of transactions
+        missing the feature (``nulls``) and number of distinct values
+        (``cardinality``). The types and ranges are taken from ``features``, and
+        the missing and distinct values are counted over all columns at once.
+
+        """
+        missing = self.transactions.isna().to_numpy()
+        nulls = missing.sum(axis=0) if self.weights is None else self.weights @ missing
+        cardinality = self.transactions.nunique()
+        report = {}
+        for i, feature in enumerate(self.features):
+            is_cat = feature.dtype == "cat"
+            report[feature.name] = [
+                "category" if is_cat else feature.dtype,
+                np.nan if is_cat else feature.min_val,
+                np.nan if is_cat else feature.max_val,
+                feature.categories if is_cat else np.nan,
+                int(nulls[i]),
+                int(cardinality[feature.name]),
+            ]
+        return pd.DataFrame(
+            report,
+            index=["dtype", "min_val", "max_val", "categories", "nulls", "cardinality"],
+            dtype=object,
+        )
+
+    def save_compiled(self, path):
+        """Save the dataset in a compiled binary format.
+
+        Every column is saved as a NumPy ``.npy`` file (category codes for
+        categorical features) next to a JSON manifest of the features, so
+        :meth:`load_compiled` neither parses the file nor infers the features
+        again. Categories other than strings, e.g. dates, are saved as ``.npy``
+        files too. A ``ValueError`` is raised for categories of mixed types or
+        other objects that NumPy can't save without pickling.
+
+        Args:
+            path (str | os.PathLike): Directory to save the dataset to. It is
+             created if it doesn't exist.
+
+        """
+        os.makedirs(path, exist_ok=True)
+        columns = []
+        for i, name in enumerate(self.header):
+            column = self.transactions[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                values = column.cat.codes.to_numpy()
+                categories = column.cat.categories
+                if categories.inferred_type in ("string", "empty"):
+                    categories = categories.tolist()
+                else:
+                    try:
+                        np.save(
+                            os.path.join(path, f"{i}.categories.npy"),
+                            categories.to_numpy(),
+                            allow_pickle=False,
+                        )
+                    except ValueError:
+                        raise ValueError(
+                            f"Categories of {name} can't be saved: they are of"
+                            f" type {categories.inferred_type}"
+                        ) from None
+                    categories = "npy"
+            else:
+                values = column.to_numpy()
+                if values.dtype == object:
+                    # nullable numbers are saved as floats with nan for missing values
+                    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+                categories = None
+            np.save(os.path.join(path, f"{i}.npy"), values)
+            columns.append({"name": name, "categories": categories})
+        if self.weights is not None:
+            np.save(os.path.join(path, "weights.npy"), self.weights)
+
+        def scalar(value):
+            return value.item() if isinstance(value, np.generic) else value
+
+        manifest = {
+            "version": _COMPILED_VERSION,
+            "columns": columns,
+            "features": [
+                {
+                    "name": feature.name,
+                    "dtype": feature.dtype,
+                    "min_val": scalar(feature.min_val),
+                    "max_val": scalar(feature.max_val),
+                }
+                for feature in self.features
+            ],
+            "weighted": self.weights is not None,
+            "bin_edges": {
+                name: edges.tolist() for name, edges in self.bin_edges.items()
+            },
+        }
+        # the manifest is written last, so a complete manifest means a complete save
+        with open(os.path.join(path, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+    @classmethod
+    def load_compiled(cls, path, mmap=True, rank_index=False, block_size=None):
+        """Load a dataset saved by :meth:`save_compiled`.
 
-            self.features.append(
-                Feature(head, dtype, min_value, max_value, unique_categories)
+        Args:
+            path (str | os.PathLike): Directory of the compiled dataset.
+            mmap (bool): Memory-map the columns instead of reading them, so that
+             loading takes about the same time for any size. Default: ``True``.
+            rank_index (bool): Build sorted-rank indices in ``store`` (see
+             :class:`Dataset`). Default: ``False``.
+            block_size (int | None): If set, ``store`` is a
+             :class:`~niaarm.store.BlockStore` that evaluates rules on the
+             memory-mapped columns in blocks of this many rows, so the dataset
+             doesn't have to fit in memory. ``rank_index`` is ignored then.
+             Default: ``None``.
+
+        Returns:
+            Dataset: The loaded dataset.
+
+        """
+        with open(os.path.join(path, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != _COMPILED_VERSION:
+            raise ValueError(
+                f"Unsupported compiled dataset version: {manifest.get('version')}"
+            )
+        mmap_mode = "r" if mmap else None
+
+        arrays = {}
+        columns = {}
+        for i, column in enumerate(manifest["columns"]):
+            values = np.load(os.path.join(path, f"{i}.npy"), mmap_mode=mmap_mode)
+            arrays[column["name"]] = values
+            if column["categories"] == "npy":
+                column["categories"] = pd.Index(
+                    np.load(os.path.join(path, f"{i}.categories.npy"))
+                ).tolist()
+            if column["categories"] is not None:
+                values = pd.Categorical.from_codes(
+                    values, categories=column["categories"], validate=False
+                )
+            columns[column["name"]] = values
+        categories = {
+            column["name"]: column["categories"] for column in manifest["columns"]
+        }
+
+        dataset = cls.__new__(cls)
+        dataset.transactions = pd.DataFrame(columns, copy=False)
+        dataset.header = dataset.transactions.columns.tolist()
+        dataset.rank_index = rank_index
+        dataset.block_size = block_size
+        dataset.features = [
+            Feature(**feature, categories=categories[feature["name"]])
+            for feature in manifest["features"]
+        ]
+        dataset.weights = (
+            np.load(os.path.join(path, "weights.npy"), mmap_mode=mmap_mode)
+            if manifest["weighted"]
+            else None
+        )
+        dataset.bin_edges = {
+            name: np.array(edges) for name, edges in manifest["bin_edges"].items()
+        }
+        dataset.dimension = dataset.__problem_dimension()
+        if block_size is not None:
+            dataset.store = BlockStore(
+                arrays,
+                {
+                    column["name"]: {
+                        category: code
+                        for code, category in enumerate(column["categories"])
+                    }
+                    for column in manifest["columns"]
+                    if column["categories"] is not None
+                },
+                FeatureStatistics.from_features(dataset.features),
+                dataset.weights,
+                block_size,
             )
+        return dataset
 
     def __problem_dimension(self):
         r"""Calculate the dimension of the problem."""
@@ -85,29 +461,13 @@ class Dataset:
         return dimension
 
     def __repr__(self):
-        def dtype(x):
-            if is_float_dtype(x):
-                return "float"
-            elif is_integer_dtype(x):
-                return "int"
-            elif x.dtype == "category":
-                return "category"
-            else:
-                return "unknown"
-
-        def min_val(x):
-            return x.min() if x.dtype != "category" else np.nan
-
-        def max_val(x):
-            return x.max() if x.dtype != "category" else np.nan
-
-        def categories(x):
-            return x.cat.categories.tolist() if x.dtype == "category" else np.nan
-
-        feature_report = self.transactions.agg([dtype, min_val, max_val, categories])
+        feature_report = self.profile.loc[["dtype", "min_val", "max_val", "categories"]]
+        num_transactions = len(self.transactions)
+        if self.weights is not None:
+            num_transactions = f"{self.weights.sum()} ({num_transactions} rows)"
         return (
             f"DATASET INFO:\n"
-            f"Number of transactions: {len(self.transactions)}\n"
+            f"Number of transactions: {num_transactions}\n"
             f"Number of features: {len(self.features)}\n\n"
             f"FEATURE INFO:\n\n"
             f"{feature_report.to_string(na_rep='N/A')}"
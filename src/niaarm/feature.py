@@ -22,6 +22,20 @@ class Feature:
         self.max_val = max_val
         self.categories = categories
 
+    @property
+    def key(self):
+        """Canonical hashable key of the feature.
+
+        The key only approximates ``__eq__``. Interval bounds are rounded to 6
+        decimals, while ``__eq__`` compares them with a tolerance of 1e-6, so two
+        bounds close enough to be equal may still round to different keys.
+        Categories are sorted, so the key ignores their order, which ``__eq__``
+        does not.
+        """
+        if self.dtype == "cat":
+            return self.name, self.dtype, tuple(sorted(self.categories))
+        return self.name, self.dtype, round(self.min_val, 6), round(self.max_val, 6)
+
     def __eq__(self, other):
         if self.dtype != other.dtype or self.name != other.name:
             return False
@@ -1,11 +1,16 @@
 import time
 from collections import namedtuple
+from functools import partial
 
 import numpy as np
+from niapy.algorithms.algorithm import default_individual_init, default_numpy_init
+from niapy.algorithms.basic import DifferentialEvolution
 from niapy.task import OptimizationType, Task
+from niapy.util.array import objects_to_array
 from niapy.util.factory import get_algorithm
 
 from niaarm.niaarm import NiaARM
+from niaarm.parallel import EvaluationPool
 from niaarm.text import NiaARTM
 
 
@@ -15,10 +20,178 @@ class Result(namedtuple("Result", ("rules", "run_time"))):
     Attributes:
         rules (RuleList): A list of mined association rules.
         run_time (float): The run time of the algorithm in seconds.
+        memo (MemoInfo | None): Hit statistics of the fitness memo table. It is not
+         part of the tuple, so ``rules, run_time = result`` keeps working, but it
+         is kept by :meth:`_replace`, copies and pickles. Default: ``None``.
 
     """
 
-    __slots__ = ()
+    memo = None
+
+    def __new__(cls, rules, run_time, memo=None):
+        result = super().__new__(cls, rules, run_time)
+        result.memo = memo
+        return result
+
+    @classmethod
+    def _make(cls, iterable, memo=None):
+        result = super()._make(iterable)
+        result.memo = memo
+        return result
+
+    def _replace(self, **kwargs):
+        memo = kwargs.pop("memo", self.memo)
+        result = super()._replace(**kwargs)
+        result.memo = memo
+        return result
+
+
+class PopulationTask(Task):
+    """Optimization task that can evaluate a whole population at once.
+
+    Populations are passed to the problem's ``evaluate_population`` method in a
+    single call, while the bookkeeping of evaluations and the best fitness is the
+    same as when calling :meth:`niapy.task.Task.eval` for each solution in order.
+
+    See Also:
+        :class:`niapy.task.Task`
+
+    """
+
+    def eval_population(self, population):
+        """Evaluate a population of solutions.
+
+        Args:
+            population (numpy.ndarray): Solutions of shape
+             ``(population_size, dimension)``.
+
+        Returns:
+            numpy.ndarray: Fitness of each solution. Solutions past the stopping
+            condition get ``inf``, same as with :meth:`niapy.task.Task.eval`.
+
+        """
+        population = np.asarray(population)
+        fitness = np.full(len(population), np.inf)
+        if self.stopping_condition():
+            return fitness
+
+        num_evals = len(population)
+        if self.max_evals != np.inf:
+            num_evals = min(num_evals, int(self.max_evals - self.evals))
+
+        if hasattr(self.problem, "evaluate_population"):
+            values = self.problem.evaluate_population(population[:num_evals])
+        else:
+            values = [self.problem.evaluate(x) for x in population[:num_evals]]
+
+        for i, value in enumerate(values):
+            if self.stopping_condition():
+                break
+            self.evals += 1
+            x_f = value * self.optimization_type.value
+            if x_f < self.x_f * self.optimization_type.value:
+                self.x_f = x_f * self.optimization_type.value
+                self.n_evals.append(self.evals)
+                self.fitness_evals.append(x_f)
+            fitness[i] = x_f
+        return fitness
+
+
+def batch_numpy_init(task, population_size, rng, **_kwargs):
+    """Batch counterpart of :func:`niapy.algorithms.algorithm.default_numpy_init`.
+
+    Generates the same population, but evaluates it with
+    :meth:`PopulationTask.eval_population`.
+    """
+    pop = rng.uniform(task.lower, task.upper, (population_size, task.dimension))
+    fpop = task.eval_population(pop)
+    return pop, fpop
+
+
+def batch_individual_init(task, population_size, rng, individual_type=None, **_kwargs):
+    """Batch counterpart of :func:`niapy.algorithms.algorithm.default_individual_init`.
+
+    Generates and repairs the same individuals, but evaluates them with
+    :meth:`PopulationTask.eval_population`.
+    """
+    pop = []
+    for _ in range(population_size):
+        individual = individual_type(task=task, rng=rng, e=False)
+        individual.x = task.repair(individual.x, rng=rng)
+        pop.append(individual)
+    fpop = task.eval_population(np.array([individual.x for individual in pop]))
+    for individual, f in zip(pop, fpop, strict=True):
+        individual.f = f
+    return objects_to_array(pop), fpop
+
+
+def batch_evolve(algorithm, pop, xb, task, **_kwargs):
+    """Batch counterpart of :meth:`niapy.algorithms.basic.DifferentialEvolution.evolve`.
+
+    Generates and repairs the same trial individuals, but evaluates the whole
+    generation with :meth:`PopulationTask.eval_population`.
+    """
+    trials = []
+    for i in range(len(pop)):
+        x = algorithm.strategy(
+            pop,
+            i,
+            algorithm.differential_weight,
+            algorithm.crossover_probability,
+            algorithm.rng,
+            x_b=xb,
+        )
+        trial = algorithm.individual_type(x=x, task=task, rng=algorithm.rng, e=False)
+        trial.x = task.repair(trial.x, rng=algorithm.rng)
+        trials.append(trial)
+    fitness = task.eval_population(np.array([trial.x for trial in trials]))
+    for trial, f in zip(trials, fitness, strict=True):
+        trial.f = f
+    return objects_to_array(trials)
+
+
+_batch_init = {
+    default_numpy_init: batch_numpy_init,
+    default_individual_init: batch_individual_init,
+}
+
+
+def _run(algorithm, problem, max_evals, max_iters, n_jobs, **kwargs):
+    task = PopulationTask(
+        problem,
+        max_evals=max_evals,
+        max_iters=max_iters,
+        optimization_type=OptimizationType.MAXIMIZATION,
+    )
+
+    if isinstance(algorithm, str):
+        algorithm = get_algorithm(algorithm, **kwargs)
+
+    # evaluate the initial population in a single batch
+    init = getattr(algorithm, "initialization_function", None)
+    if init in _batch_init:
+        algorithm.initialization_function = _batch_init[init]
+    # evaluate every generation of differential evolution in a single batch
+    if getattr(type(algorithm), "evolve", None) is DifferentialEvolution.evolve:
+        algorithm.evolve = partial(batch_evolve, algorithm)
+
+    if n_jobs == 1:
+        start_time = time.perf_counter()
+        algorithm.run(task)
+        stop_time = time.perf_counter()
+    else:
+        with EvaluationPool(problem.store, n_jobs) as pool:
+            problem.pool = pool
+            try:
+                start_time = time.perf_counter()
+                algorithm.run(task)
+                stop_time = time.perf_counter()
+            finally:
+                problem.pool = None
+
+    problem.rules.sort()
+
+    return Result(problem.rules, stop_time - start_time, problem.memo.info())
 
 
 def get_rules(
@@ -28,6 +201,7 @@ def get_rules(
     max_evals=np.inf,
     max_iters=np.inf,
     logging=False,
+    n_jobs=1,
     **kwargs,
 ):
     """Mine association rules on a dataset.
@@ -45,6 +219,12 @@ def get_rules(
          least one of ``max_evals`` or ``max_iters`` must be provided.
         max_iters (int | None): Maximum number of fitness evaluations. Default: ``inf``.
         logging (bool): Enable logging of fitness improvements. Default: ``False``.
+        n_jobs (int): Number of worker processes to evaluate rules in. The
+         transactions are shared with the workers through shared memory and each
+         worker counts a shard of them. Populations are sent to the workers in one
+         batch: the initial population, and every generation of differential
+         evolution. Rules evaluated one at a time are counted in the current
+         process. ``-1`` uses all CPUs. Default: 1.
 
     Returns:
         Result: A named tuple containing the list of mined rules and the algorithm's
@@ -52,25 +232,9 @@ def get_rules(
 
     """
     problem = NiaARM(
-        dataset.dimension, dataset.features, dataset.transactions, metrics, logging
-    )
-    task = Task(
-        problem,
-        max_evals=max_evals,
-        max_iters=max_iters,
-        optimization_type=OptimizationType.MAXIMIZATION,
+        dataset.dimension, dataset.features, dataset.store, metrics, logging
     )
-
-    if isinstance(algorithm, str):
-        algorithm = get_algorithm(algorithm, **kwargs)
-
-    start_time = time.perf_counter()
-    algorithm.run(task)
-    stop_time = time.perf_counter()
-
-    problem.rules.sort()
-
-    return Result(problem.rules, stop_time - start_time)
+    return _run(algorithm, problem, max_evals, max_iters, n_jobs, **kwargs)
 
 
 def get_text_rules(
@@ -84,6 +248,7 @@ def get_text_rules(
     max_evals=np.inf,
     max_iters=np.inf,
     logging=False,
+    n_jobs=1,
     **kwargs,
 ):
     """Mine association rules in a text corpus.
@@ -107,6 +272,10 @@ def get_text_rules(
          least one of ``max_evals`` or ``max_iters`` must be provided.
         max_iters (int | None): Maximum number of fitness evaluations. Default: ``inf``.
         logging (bool): Enable logging of fitness improvements. Default: ``False``.
+        n_jobs (int): Number of worker processes to evaluate rules in. The
+         transactions are shared with the workers through shared memory and each
+         worker counts a shard of them, as in :func:`get_rules`. ``-1`` uses all
+         CPUs. Default: 1.
 
     Returns:
         Result: A named tuple containing the list of mined rules and the algorithm's
@@ -121,20 +290,4 @@ def get_text_rules(
         threshold,
         logging,
     )
-    task = Task(
-        problem,
-        max_evals=max_evals,
-        max_iters=max_iters,
-        optimization_type=OptimizationType.MAXIMIZATION,
-    )
-
-    if isinstance(algorithm, str):
-        algorithm = get_algorithm(algorithm, **kwargs)
-
-    start_time = time.perf_counter()
-    algorithm.run(task)
-    stop_time = time.perf_counter()
-
-    problem.rules.sort()
-
-    return Result(problem.rules, stop_time - start_time)
+    return _run(algorithm, problem, max_evals, max_iters, n_jobs, **kwargs)
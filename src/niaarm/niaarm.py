@@ -1,9 +1,11 @@
 import numpy as np
 from niapy.problems import Problem
 
+from niaarm.cache import FitnessMemo
 from niaarm.feature import Feature
 from niaarm.rule import Rule
 from niaarm.rule_list import RuleList
+from niaarm.store import BlockStore, TransactionStore, pack_bits
 
 
 class NiaARM(Problem):
@@ -28,15 +30,27 @@ class NiaARM(Problem):
     Args:
         dimension (int): Dimension of the optimization problem for the dataset.
         features (list[Feature]): List of the dataset's features.
-        transactions (pandas.Dataframe): The dataset's transactions.
+        transactions (pandas.Dataframe | TransactionStore): The dataset's transactions.
+         A DataFrame is compiled into a :class:`TransactionStore` once, on
+         construction.
         metrics (dict[str, float] | Sequence[str]): Metrics to take into account when
          computing the fitness. Metrics can either be passed as a Dict of pairs
          {'metric_name': <weight>} or a sequence of metrics as strings, in which case,
          the weights of the metrics will be set to 1.
         logging (bool): Enable logging of fitness improvements. Default: ``False``.
+        memo_size (int): Maximum number of decoded rules whose fitness is memoized.
+         Default: 65536.
 
     Attributes:
         rules (RuleList): A list of mined association rules.
+        memo (FitnessMemo): Fitness of recently evaluated rules, looked up before
+         the transactions are counted.
+        store (TransactionStore): Compiled transactions the rules are evaluated on.
+        rule_keys (set[tuple]): Keys of the rules in ``rules``, used to detect
+         duplicate rules in constant time.
+        pool (EvaluationPool | None): Process pool the transactions of populations
+         are counted in. If ``None``, or for single rules, rules are evaluated in
+         the current process.
 
     """
 
@@ -51,10 +65,23 @@ class NiaARM(Problem):
         "rhs_support",
     )
 
-    def __init__(self, dimension, features, transactions, metrics, logging=False):
+    def __init__(
+        self,
+        dimension,
+        features,
+        transactions,
+        metrics,
+        logging=False,
+        memo_size=2**16,
+    ):
         self.features = features
         self.num_features = len(features)
         self.transactions = transactions
+        self.store = (
+            transactions
+            if isinstance(transactions, TransactionStore)
+            else TransactionStore(transactions)
+        )
 
         if not metrics:
             raise ValueError("No metrics provided")
@@ -73,108 +100,343 @@ class NiaARM(Problem):
             raise ValueError(f"Invalid metric(s): {invalid}")
 
         self.sum_weights = np.sum(self.weights)
+        # rules without antecedent transactions get the same fitness regardless of
+        # the consequent count unless a metric depends on it
+        self._skip_empty = not {"rhs_support", "interestingness"} & set(self.metrics)
 
         self.logging = logging
         self.best_fitness = -np.inf
         self.rules = RuleList()
+        self.rule_keys = set()
+        self.memo = FitnessMemo(memo_size)
+        self.pool = None
+        self._init_decoding()
         super().__init__(dimension, 0.0, 1.0)
 
-    def build_rule(self, vector):
-        rule = []
-
-        permutation = vector[-self.num_features :]
-        permutation = sorted(range(self.num_features), key=lambda k: permutation[k])
-
-        for i in permutation:
-            feature = self.features[i]
+    def _init_decoding(self):
+        r"""Precompute the vector layout and value ranges of the features."""
+        is_cat = np.array([feature.dtype == "cat" for feature in self.features])
+        self._is_cat = is_cat.tolist()
+        self._int_features = np.flatnonzero(
+            [feature.dtype == "int" for feature in self.features]
+        )
+        self._positions = np.concatenate(([0], np.cumsum(3 - is_cat)[:-1])).astype(int)
+        self._thresholds = self._positions + 2 - is_cat
+        self._min = np.array(
+            [0.0 if f.dtype == "cat" else f.min_val for f in self.features], dtype=float
+        )
+        self._range = np.array(
+            [0.0 if f.dtype == "cat" else f.max_val - f.min_val for f in self.features],
+            dtype=float,
+        )
+        self._max_category = np.array(
+            [len(f.categories) - 1 if f.dtype == "cat" else 0 for f in self.features]
+        )
+
+    def decode(self, vectors):
+        r"""Decode solution vectors into compact rule arrays.
+
+        Args:
+            vectors (numpy.ndarray): Solutions without the cut point, of shape
+             ``(num_solutions, dimension - 1)``.
+
+        Returns:
+            tuple[numpy.ndarray, ...]: Arrays of shape ``(num_solutions,
+            num_features)``: the order of features in each rule, which features are
+            present in the rule, lower and upper interval bounds of numerical
+            features and selected category indices of categorical features.
+
+        """
+        vectors = np.asarray(vectors)
+        permutation = np.argsort(
+            vectors[:, -self.num_features :], axis=1, kind="stable"
+        )
+        values = vectors[:, self._positions]
+        active = values > vectors[:, self._thresholds]
+
+        border1 = values * self._range + self._min
+        border2 = vectors[:, self._positions + 1] * self._range + self._min
+        lower = np.minimum(border1, border2)
+        upper = np.maximum(border1, border2)
+        if self._int_features.size:
+            lower[:, self._int_features] = lower[:, self._int_features].round()
+            upper[:, self._int_features] = upper[:, self._int_features].round()
+        category = (values * self._max_category).round().astype(int)
+        return permutation, active, lower, upper, category
+
+    def attribute(self, i, lower, upper, category):
+        r"""Construct the attribute of the ``i``-th feature from decoded values."""
+        feature = self.features[i]
+        if feature.dtype == "cat":
+            return Feature(
+                feature.name, feature.dtype, categories=[feature.categories[category]]
+            )
+        if feature.dtype == "int":
+            return Feature(feature.name, feature.dtype, int(lower), int(upper))
+        return Feature(feature.name, feature.dtype, lower, upper)
 
-            # set current position in the vector
-            vector_position = self.feature_position(i)
-
-            # get a threshold for each feature
-            threshold_position = vector_position + 1 + int(feature.dtype != "cat")
-            if vector[vector_position] > vector[threshold_position]:
-                if feature.dtype != "cat":
-                    border1 = (
-                        vector[vector_position] * (feature.max_val - feature.min_val)
-                        + feature.min_val
-                    )
-                    vector_position = vector_position + 1
-                    border2 = (
-                        vector[vector_position] * (feature.max_val - feature.min_val)
-                        + feature.min_val
-                    )
-                    if border1 > border2:
-                        border1, border2 = border2, border1
-                    if feature.dtype == "int":
-                        border1 = round(border1)
-                        border2 = round(border2)
-                    rule.append(Feature(feature.name, feature.dtype, border1, border2))
-                else:
-                    categories = feature.categories
-                    selected = round(vector[vector_position] * (len(categories) - 1))
-                    rule.append(
-                        Feature(
-                            feature.name,
-                            feature.dtype,
-                            categories=[categories[selected]],
-                        )
-                    )
-            else:
-                rule.append(None)
-        return rule
+    def build_rule(self, vector):
+        permutation, active, lower, upper, category = self.decode([vector])
+        return [
+            self.attribute(i, lower[0, i], upper[0, i], category[0, i])
+            if active[0, i]
+            else None
+            for i in permutation[0]
+        ]
+
+    def memo_key(self, antecedent, consequent, lower, upper, category):
+        r"""Get the memo key of a decoded rule.
+
+        Args:
+            antecedent (numpy.ndarray): Indices of the antecedent features in order.
+            consequent (numpy.ndarray): Indices of the consequent features in order.
+            lower (list[float]): Decoded lower bounds of the features.
+            upper (list[float]): Decoded upper bounds of the features.
+            category (list[int]): Decoded category indices of the features.
+
+        Returns:
+            tuple: Key that is equal for rules with the same items in the same order.
+
+        """
+        return tuple(
+            tuple(
+                (i, category[i]) if self._is_cat[i] else (i, lower[i], upper[i])
+                for i in items.tolist()
+            )
+            for items in (antecedent, consequent)
+        )
 
     def threshold_move(self, current_feature):
         return 1 + int(self.features[current_feature].dtype != "cat")
 
     def feature_position(self, feature):
-        position = 0
-        for f in self.features[:feature]:
-            position = position + 2 + int(f.dtype != "cat")
-        return position
+        return int(self._positions[feature])
 
     def _evaluate(self, sol):
         r"""Evaluate association rule."""
-        cut_value = sol[self.dimension - 1]  # get cut point value
-        solution = sol[:-1]  # remove cut point
-
-        cut = _cut_point(cut_value, self.num_features)
-
-        rule = self.build_rule(solution)
+        cut = _cut_point(sol[self.dimension - 1], self.num_features)
+        permutation, active, lower, upper, category = self.decode([sol[:-1]])
 
         # get antecedent and consequent of rule
-        antecedent = rule[:cut]
-        consequent = rule[cut:]
-
-        antecedent = [attribute for attribute in antecedent if attribute]
-        consequent = [attribute for attribute in consequent if attribute]
+        order = permutation[0]
+        antecedent = order[:cut][active[0, order[:cut]]]
+        consequent = order[cut:][active[0, order[cut:]]]
 
         # check if the rule is feasible
-        if antecedent and consequent:
-            rule = Rule(antecedent, consequent, transactions=self.transactions)
-            metrics = [getattr(rule, metric) for metric in self.metrics]
-            fitness = np.dot(self.weights, metrics) / self.sum_weights
-            rule.fitness = fitness
-
-            if rule.support > 0.0 and rule.confidence > 0.0 and rule not in self.rules:
-                # save feasible rule
-                self.rules.append(rule)
-
-                if self.logging and fitness > self.best_fitness:
-                    self.best_fitness = fitness
-                    print(
-                        f"Fitness: {rule.fitness}, "
-                        + ", ".join(
-                            [
-                                f"{metric.capitalize()}: {metrics[i]}"
-                                for i, metric in enumerate(self.metrics)
-                            ]
-                        )
-                    )
+        if len(antecedent) and len(consequent):
+            key = self.memo_key(
+                antecedent,
+                consequent,
+                lower[0].tolist(),
+                upper[0].tolist(),
+                category[0],
+            )
+            fitness = self.memo.get(key)
+            if fitness is not None:
+                return fitness
+
+            antecedent = [
+                self.attribute(i, lower[0, i], upper[0, i], category[0, i])
+                for i in antecedent
+            ]
+            consequent = [
+                self.attribute(i, lower[0, i], upper[0, i], category[0, i])
+                for i in consequent
+            ]
+            rule = Rule(antecedent, consequent)
+            # a single rule is counted here, since sending it to the pool would
+            # cost more than counting it
+            counts = self.store.counts(antecedent, consequent, self._skip_empty)
+            rule.__post_init__(self.store, counts)
+            fitness = self._record(rule)
+            self.memo.put(key, fitness)
             return fitness
         else:
             return -1.0
 
+    def evaluate_population(self, population):
+        r"""Evaluate a population of solutions at once.
+
+        Cut points and rules are decoded for the whole population in vectorized
+        form. Only rules that are neither memoized nor repeated earlier in the
+        population are counted, all in a single round trip to the pool if there
+        is one. On a :class:`~niaarm.store.BlockStore`, the transaction masks are
+        built feature by feature for all rules together in each block. Feasible
+        rules are archived in the same order as if the solutions were evaluated
+        one by one.
+
+        Args:
+            population (numpy.ndarray): Solutions of shape
+             ``(population_size, dimension)``.
+
+        Returns:
+            numpy.ndarray: Fitness of each solution.
+
+        """
+        population = np.asarray(population)
+        if population.ndim != 2 or population.shape[1] != self.dimension:
+            raise ValueError(
+                f"Dimensions do not match. {population.shape[-1]} != {self.dimension}"
+            )
+
+        # vectorized _cut_point
+        cut = (population[:, -1] * self.num_features).astype(int)
+        cut[cut == 0] = 1
+        cut[cut > self.num_features - 1] = self.num_features - 2
+
+        permutation, active, lower, upper, category = self.decode(population[:, :-1])
+        in_antecedent = np.argsort(permutation, axis=1) < cut[:, None]
+
+        feasible = (active & in_antecedent).any(axis=1) & (active & ~in_antecedent).any(
+            axis=1
+        )
+
+        fitness = np.full(len(population), -1.0)
+        keys = {}
+        pending = {}
+        for p in np.flatnonzero(feasible).tolist():
+            order = permutation[p][active[p, permutation[p]]]
+            is_antecedent = in_antecedent[p, order]
+            key = self.memo_key(
+                order[is_antecedent],
+                order[~is_antecedent],
+                lower[p].tolist(),
+                upper[p].tolist(),
+                category[p].tolist(),
+            )
+            if key in pending:
+                # evaluated one by one, the repeated rule would be memoized by now
+                self.memo.hits += 1
+            else:
+                value = self.memo.get(key)
+                if value is not None:
+                    fitness[p] = value
+                    continue
+                pending[key] = p
+            keys[p] = key
+
+        rows = np.array(list(pending.values()), dtype=int)
+        rules = []
+        for p in rows.tolist():
+            antecedent = []
+            consequent = []
+            for i in permutation[p]:
+                if not active[p, i]:
+                    continue
+                attribute = self.attribute(i, lower[p, i], upper[p, i], category[p, i])
+                if in_antecedent[p, i]:
+                    antecedent.append(attribute)
+                else:
+                    consequent.append(attribute)
+            rules.append(Rule(antecedent, consequent))
+
+        if isinstance(self.store, BlockStore):
+            # blocks have no index, so the masks of all rules are built per block
+            args = (
+                self.features,
+                active[rows],
+                in_antecedent[rows],
+                lower[rows],
+                upper[rows],
+                category[rows],
+            )
+            reducer = self.pool if self.pool is not None else self.store
+            counts = reducer.reduce(_population_counts, *args)
+        elif self.pool is not None:
+            # a single round trip to the workers for the whole population
+            counts = self.pool.reduce(_rule_counts, rules)
+        else:
+            counts = _rule_counts(self.store, rules, self._skip_empty)
+        antecedent_count, consequent_count, full_count = counts
+
+        for j, (p, rule) in enumerate(zip(rows.tolist(), rules, strict=True)):
+            rule.__post_init__(
+                self.store, (antecedent_count[j], consequent_count[j], full_count[j])
+            )
+            fitness[p] = self._record(rule)
+            self.memo.put(keys[p], fitness[p])
+
+        # repeated rules take the fitness of their first occurrence
+        for p, key in keys.items():
+            if pending[key] != p:
+                fitness[p] = fitness[pending[key]]
+        return fitness
+
+    def _record(self, rule):
+        r"""Compute the fitness of a feasible rule and archive it if it is new."""
+        metrics = [getattr(rule, metric) for metric in self.metrics]
+        fitness = np.dot(self.weights, metrics) / self.sum_weights
+        rule.fitness = fitness
+
+        if (
+            rule.support > 0.0
+            and rule.confidence > 0.0
+            and rule.key not in self.rule_keys
+        ):
+            # save feasible rule
+            self.rules.append(rule)
+            self.rule_keys.add(rule.key)
+
+            if self.logging and fitness > self.best_fitness:
+                self.best_fitness = fitness
+                print(
+                    f"Fitness: {rule.fitness}, "
+                    + ", ".join(
+                        [
+                            f"{metric.capitalize()}: {metrics[i]}"
+                            for i, metric in enumerate(self.metrics)
+                        ]
+                    )
+                )
+        return fitness
+
+
+def _rule_counts(store, rules, skip_empty=False):
+    r"""Count transactions containing the antecedents, consequents and whole rules
+    of several rules, each with :meth:`TransactionStore.counts`."""
+    counts = np.zeros((3, len(rules)), dtype=np.int64)
+    for j, rule in enumerate(rules):
+        counts[:, j] = store.counts(rule.antecedent, rule.consequent, skip_empty)
+    return tuple(counts)
+
+
+def _population_counts(
+    store, features, active, in_antecedent, lower, upper, category, skip_empty=False
+):
+    r"""Count transactions containing the antecedents, consequents and whole rules
+    of a decoded population.
+
+    If ``skip_empty`` is set, consequents of rules without antecedent transactions
+    are not counted and their count is reported as 0."""
+    all_transactions = pack_bits(np.ones(store.num_rows, dtype=bool))
+    antecedents = np.tile(all_transactions, (len(active), 1))
+    consequents = antecedents.copy()
+    for bitsets, side in ((antecedents, in_antecedent), (consequents, ~in_antecedent)):
+        if bitsets is consequents and skip_empty:
+            antecedent_count = store.count(antecedents)
+            active = active & (antecedent_count > 0)[:, None]
+        selected = active & side
+        for i, feature in enumerate(features):
+            rows = np.flatnonzero(selected[:, i])
+            if len(rows) == 0:
+                continue
+            if feature.dtype != "cat":
+                bits = store.interval_bits(feature.name, lower[rows, i], upper[rows, i])
+            else:
+                bits = store.category_bits(
+                    feature.name, [feature.categories[k] for k in category[rows, i]]
+                )
+            bitsets[rows] &= bits
+
+    consequent_count = store.count(consequents)
+    if skip_empty:
+        consequent_count[antecedent_count == 0] = 0
+    return (
+        store.count(antecedents),
+        consequent_count,
+        store.count(antecedents & consequents),
+    )
+
 
 def _cut_point(sol, num_attr):
     r"""Calculate cut point.
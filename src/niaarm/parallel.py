@@ -0,0 +1,145 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from niaarm.store import BlockStore, TransactionStore
+
+_shared = {}
+
+
+def _open(array):
+    r"""Open an array shared by :meth:`EvaluationPool._share`."""
+    if array[0] == "file":
+        _, filename, offset, dtype, shape = array
+        return np.memmap(filename, dtype=dtype, mode="r", offset=offset, shape=shape)
+    _, block_name, dtype, shape = array
+    block = shared_memory.SharedMemory(name=block_name)
+    _shared["blocks"].append(block)
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _attach(start, stop, columns, categories, weights, cache_bytes, block_size):
+    r"""Attach a worker process to the shard ``start:stop`` of a store's shared
+    columns."""
+    _shared["blocks"] = []
+    columns = {name: _open(column)[start:stop] for name, column in columns.items()}
+    weights = None if weights is None else _open(weights)[start:stop]
+    if block_size:
+        store = BlockStore(columns, categories, weights=weights, block_size=block_size)
+    else:
+        store = TransactionStore.from_arrays(
+            columns, categories, cache_bytes=cache_bytes, weights=weights
+        )
+    _shared["store"] = store
+
+
+def _run_shard(function, args):
+    r"""Call ``function`` on the shard of the transactions of a worker process."""
+    store = _shared["store"]
+    if isinstance(store, BlockStore):
+        return store.reduce(function, *args)
+    return function(store, *args)
+
+
+class EvaluationPool:
+    r"""Process pool for evaluating rules on shared-memory transactions.
+
+    The columns of a :class:`~niaarm.store.TransactionStore` are copied once into
+    :mod:`multiprocessing.shared_memory` blocks which the worker processes attach
+    to, so the transactions are never pickled. Every worker counts a contiguous
+    shard of the transactions and the counts are summed in the parent process,
+    which keeps the results identical to serial evaluation. Every worker always
+    counts the same shard, so if the store has an item cache, the workers share
+    its memory budget equally. Memory-mapped columns of a
+    :class:`~niaarm.store.BlockStore` are mapped by the workers from their files
+    instead, and every worker counts its shard block by block.
+
+    Args:
+        store (TransactionStore): Compiled transactions.
+        n_jobs (int): Number of worker processes. ``-1`` uses all CPUs.
+
+    """
+
+    def __init__(self, store, n_jobs):
+        if n_jobs == -1:
+            n_jobs = os.cpu_count()
+        if n_jobs < 1:
+            raise ValueError(f"Invalid number of jobs: {n_jobs}")
+
+        self.n_jobs = n_jobs
+        self.blocks = []
+        columns = {name: self._share(column) for name, column in store.columns.items()}
+        weights = None if store.weights is None else self._share(store.weights)
+
+        block_size = store.block_size if isinstance(store, BlockStore) else None
+        bounds = np.linspace(0, store.num_rows, n_jobs + 1).astype(int)
+        self.shards = list(zip(bounds[:-1], bounds[1:], strict=True))
+        cache_bytes = store.cache.max_bytes // n_jobs if store.cache else 0
+        # one single-process executor per shard pins the shards to the workers
+        self.executors = [
+            ProcessPoolExecutor(
+                1,
+                initializer=_attach,
+                initargs=(
+                    start,
+                    stop,
+                    columns,
+                    store.categories,
+                    weights,
+                    cache_bytes,
+                    block_size,
+                ),
+            )
+            for start, stop in self.shards
+        ]
+
+    def _share(self, array):
+        r"""Copy an array into a new shared memory block, unless it is memory-mapped
+        from a file, which the workers map themselves."""
+        # views of a memory map keep the offset of the whole map
+        if (
+            isinstance(array, np.memmap)
+            and array.filename
+            and not isinstance(array.base, np.ndarray)
+        ):
+            return "file", array.filename, array.offset, array.dtype, array.shape
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+        self.blocks.append(block)
+        return "memory", block.name, array.dtype, array.shape
+
+    def reduce(self, function, *args):
+        r"""Call ``function(shard, *args)`` on every shard and sum the results.
+
+        Args:
+            function (Callable): Module level function taking a
+             :class:`~niaarm.store.TransactionStore` shard as the first argument
+             and returning a tuple of counts.
+            args: Additional arguments passed to ``function``.
+
+        Returns:
+            tuple: Element-wise sums of the results of all shards.
+
+        """
+        futures = [
+            executor.submit(_run_shard, function, args) for executor in self.executors
+        ]
+        results = [future.result() for future in futures]
+        return tuple(sum(values) for values in zip(*results, strict=True))
+
+    def close(self):
+        r"""Shut down the workers and release the shared memory."""
+        for executor in self.executors:
+            executor.shutdown()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
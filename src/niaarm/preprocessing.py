@@ -1,8 +1,33 @@
+import copy
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
-from pandas.api.types import is_float_dtype, is_integer_dtype
+from pandas.api.types import is_bool_dtype, is_float_dtype, is_integer_dtype
+from scipy import sparse
+from sklearn.neighbors import KDTree
 
 from niaarm.dataset import Dataset
+from niaarm.feature import Feature
+from niaarm.rule_list import RuleList
+
+
+class SquashInfo(
+    namedtuple("SquashInfo", ("num_transactions", "num_clusters", "pairs_compared"))
+):
+    """Summary of a :func:`squash` run as a ``namedtuple``.
+
+    Attributes:
+        num_transactions (int): Number of rows in the input dataset.
+        num_clusters (int): Number of rows in the squashed dataset.
+        pairs_compared (int): Number of transaction pairs whose similarity was
+         computed.
+
+    """
+
+    __slots__ = ()
 
 
 def euclidean(reference, targets, *, cat_data, num_data, cat_weights, num_weights):
@@ -63,100 +88,1050 @@ def mean_or_mode(column):
         return column.mode()[0]
 
 
-def squash(dataset, threshold, similarity="euclidean"):
+class _NeighborIndex:
+    r"""KD-tree index of the candidate neighbours for euclidean squashing.
+
+    The trees are built over the numerical features scaled by the square roots of
+    their weights, so that tree distances are the numerical part of the
+    :func:`euclidean` distance. Categorical mismatches only add to the distance,
+    so the transactions within radius ``1 - threshold`` of the tree are a superset
+    of the similar transactions. If even a single categorical mismatch exceeds the
+    radius, transactions are partitioned by their categories with one tree each.
+
+    """
+
+    def __init__(self, threshold, *, cat_data, num_data, cat_weights, num_weights):
+        num_transactions = len(cat_data if cat_data is not None else num_data)
+        # slightly larger radius, so rounding never drops a similar transaction
+        self.radius = (1 - threshold) * (1 + 1e-9)
+
+        if cat_data is not None and self.radius**2 < cat_weights.min():
+            groups = (
+                pd.DataFrame(cat_data)
+                .groupby(list(range(cat_data.shape[1])), dropna=False, sort=False)
+                .ngroup()
+                .to_numpy()
+            )
+        else:
+            groups = np.zeros(num_transactions, dtype=int)
+
+        if num_data is not None:
+            finite = np.isfinite(num_weights)
+            self.points = num_data.astype(np.float64) * np.sqrt(
+                np.where(finite, num_weights, 0.0)
+            )
+            # transactions with missing values are not similar to any other
+            groups = np.where(np.isnan(self.points).any(axis=1), -1, groups)
+            if not finite.all():
+                # a constant feature has an infinite weight, which makes every
+                # euclidean distance nan, so no two transactions are similar
+                groups[:] = -1
+        else:
+            self.points = None
+        self.groups = groups
+
+        order = np.argsort(groups, kind="stable")
+        bounds = np.flatnonzero(np.diff(groups[order])) + 1
+        self.trees = {}
+        for rows in np.split(order, bounds):
+            if groups[rows[0]] < 0:
+                continue
+            tree = KDTree(self.points[rows]) if self.points is not None else None
+            self.trees[groups[rows[0]]] = tree, rows
+
+    def query(self, references):
+        r"""Get candidate neighbours of several transactions.
+
+        Args:
+            references (numpy.ndarray): Indices of the reference transactions.
+
+        Returns:
+            dict[int, numpy.ndarray]: Indices of the candidate transactions of each
+            reference transaction.
+
+        """
+        candidates = {}
+        groups = self.groups[references]
+        for group in np.unique(groups).tolist():
+            selected = references[groups == group]
+            if group < 0 or self.radius < 0:
+                neighbors = [np.empty(0, dtype=int)] * len(selected)
+            else:
+                tree, rows = self.trees[group]
+                if tree is None:
+                    neighbors = [rows] * len(selected)
+                else:
+                    found = tree.query_radius(self.points[selected], self.radius)
+                    neighbors = [rows[found_rows] for found_rows in found]
+            candidates.update(zip(selected.tolist(), neighbors, strict=True))
+        return candidates
+
+
+def _sparse_onehot(transactions):
+    r"""Encode transactions as a sparse matrix, like :func:`pandas.get_dummies`.
+
+    Numerical features are kept as they are and each category of a categorical
+    feature gets its own column, which is 1 for the transactions with that
+    category.
+
+    Args:
+        transactions (pandas.DataFrame): Transactions to encode.
+
+    Returns:
+        scipy.sparse.csr_matrix: Encoded transactions.
+
+    """
+    num_transactions = len(transactions)
+    positions = np.arange(num_transactions)
+    rows, cols, values = [], [], []
+    num_columns = 0
+    for name in transactions.columns:
+        column = transactions[name]
+        if is_float_dtype(column) or is_integer_dtype(column):
+            column_values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = column_values != 0
+            rows.append(positions[present])
+            cols.append(np.full(present.sum(), num_columns))
+            values.append(column_values[present])
+            num_columns += 1
+        else:
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype("category")
+            codes = column.cat.codes.to_numpy().astype(np.int64)
+            present = codes >= 0
+            rows.append(positions[present])
+            cols.append(codes[present] + num_columns)
+            values.append(np.ones(present.sum()))
+            num_columns += len(column.cat.categories)
+    return sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(num_transactions, num_columns),
+    )
+
+
+class _HyperplaneIndex:
+    r"""Random hyperplane LSH index of the candidate neighbours for cosine squashing.
+
+    Every table hashes a transaction to the signs of its projections onto
+    ``num_hyperplanes`` random hyperplanes, so two transactions at angle
+    :math:`\theta` share a bucket with probability
+    :math:`(1 - \theta / \pi)^{num\_hyperplanes}`. Candidates are the transactions
+    sharing a bucket in at least one of the ``num_tables`` tables.
+
+    """
+
+    def __init__(self, matrix, *, num_tables, num_hyperplanes, seed=None):
+        num_transactions, num_columns = matrix.shape
+        rng = np.random.default_rng(seed)
+        hyperplanes = rng.standard_normal((num_columns, num_tables * num_hyperplanes))
+        signs = np.asarray(matrix @ hyperplanes) > 0
+        powers = np.left_shift(1, np.arange(num_hyperplanes, dtype=np.uint64))
+
+        # transactions with missing values or no values are not similar to any other
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        valid = np.flatnonzero(np.isfinite(norms) & (norms > 0))
+        self.norms = norms
+        self._positions = np.empty(num_transactions, dtype=np.intp)
+
+        self.buckets = np.full((num_tables, num_transactions), -1)
+        self.members = []
+        for table in range(num_tables):
+            table_signs = signs[
+                valid, table * num_hyperplanes : (table + 1) * num_hyperplanes
+            ]
+            keys = table_signs.astype(np.uint64) @ powers
+            _, inverse = np.unique(keys, return_inverse=True)
+            self.buckets[table, valid] = inverse
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+            self.members.append(np.split(valid[order], bounds))
+
+    def query(self, reference):
+        r"""Get candidate neighbours of a transaction.
+
+        Args:
+            reference (int): Index of the reference transaction.
+
+        Returns:
+            numpy.ndarray: Indices of the candidate transactions.
+
+        """
+        buckets = self.buckets[:, reference]
+        if buckets[0] < 0:
+            return np.empty(0, dtype=int)
+        candidates = np.concatenate(
+            [
+                members[bucket]
+                for members, bucket in zip(self.members, buckets, strict=True)
+            ]
+        )
+        # keep the last occurrence of each candidate, without sorting
+        positions = np.arange(len(candidates))
+        self._positions[candidates] = positions
+        return candidates[self._positions[candidates] == positions]
+
+
+def _aggregate(transactions, labels, num_clusters, weights):
+    r"""Aggregate the transactions of all clusters at once.
+
+    Numerical features are averaged (and rounded for integer features) and
+    categorical features take the mode, both weighted by ``weights``. Missing
+    values are ignored and ties are broken in favour of the first category.
+
+    Args:
+        transactions (pandas.DataFrame): Transactions to aggregate.
+        labels (numpy.ndarray): Cluster label of each transaction.
+        num_clusters (int): Number of clusters.
+        weights (numpy.ndarray): Number of transactions each row stands for.
+
+    Returns:
+        pandas.DataFrame: One transaction per cluster, ordered by label.
+
+    """
+    columns = {}
+    for name in transactions.columns:
+        column = transactions[name]
+        if is_float_dtype(column) or is_integer_dtype(column):
+            values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(values)
+            totals = np.bincount(
+                labels[present], weights[present] * values[present], num_clusters
+            )
+            counts = np.bincount(labels[present], weights[present], num_clusters)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = totals / counts
+            if isinstance(column.dtype, pd.api.extensions.ExtensionDtype):
+                # nullable integers, e.g. discretized features with missing values
+                means = pd.array(np.round(means), dtype=column.dtype)
+            elif is_integer_dtype(column):
+                means = np.round(means).astype(column.dtype)
+            columns[name] = means
+        else:
+            if not isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype("category")
+            codes = column.cat.codes.to_numpy()
+            num_categories = len(column.cat.categories)
+            present = codes >= 0
+            counts = np.bincount(
+                labels[present] * num_categories + codes[present],
+                weights[present],
+                num_clusters * num_categories,
+            ).reshape(num_clusters, num_categories)
+            modes = counts.argmax(axis=1)
+            modes[counts.max(axis=1, initial=0) == 0] = -1
+            columns[name] = pd.Categorical.from_codes(
+                modes, dtype=column.dtype
+            ).remove_unused_categories()
+    return pd.DataFrame(columns)
+
+
+def _encode(dataset, similarity, method):
+    r"""Encode the transactions of a dataset for comparing them.
+
+    Returns:
+        dict: Keyword arguments of :func:`_cluster` with the data of all
+        transactions.
+
+    """
+    transactions = dataset.transactions
+    if method == "lsh":
+        return {"onehot": _sparse_onehot(transactions)}
+    if similarity == "cosine":
+        return {"onehot": pd.get_dummies(transactions).to_numpy(dtype=np.float64)}
+
+    features = dataset.features
+    cat_features = [f for f in features if f.dtype == "cat"]
+    num_features = [f for f in features if f.dtype != "cat"]
+
+    cat_weights = (
+        np.array([1 / len(f.categories) ** 2 for f in cat_features])
+        if cat_features
+        else None
+    )
+    num_weights = (
+        np.array([(1 / (f.max_val - f.min_val)) ** 2 for f in num_features])
+        if num_features
+        else None
+    )
+
+    cat_data = (
+        transactions[[f.name for f in cat_features]].to_numpy()
+        if cat_features
+        else None
+    )
+    num_data = (
+        transactions[[f.name for f in num_features]].to_numpy(
+            dtype=np.float64, na_value=np.nan
+        )
+        if num_features
+        else None
+    )
+    return {
+        "cat_data": cat_data,
+        "num_data": num_data,
+        "cat_weights": cat_weights,
+        "num_weights": num_weights,
+    }
+
+
+def _subset(data, rows):
+    r"""Select the transactions ``rows`` of data encoded by :func:`_encode`."""
+    subset = dict(data)
+    for key in ("onehot", "cat_data", "num_data"):
+        if subset.get(key) is not None:
+            subset[key] = subset[key][rows]
+    return subset
+
+
+def _cluster(
+    threshold,
+    similarity,
+    method,
+    *,
+    onehot=None,
+    cat_data=None,
+    num_data=None,
+    cat_weights=None,
+    num_weights=None,
+    num_tables=8,
+    num_hyperplanes=16,
+    seed=None,
+):
+    r"""Label the clusters of similar transactions.
+
+    Every transaction that is not yet labelled starts a new cluster, to which all
+    of the following unlabelled transactions similar to it are added.
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray, int]: Cluster label of each
+        transaction, index of the transaction that started each cluster and the
+        number of compared pairs.
+
+    """
+    num_transactions = (
+        onehot if onehot is not None else cat_data if cat_data is not None else num_data
+    ).shape[0]
+
+    if method == "lsh":
+        index = _HyperplaneIndex(
+            onehot,
+            num_tables=num_tables,
+            num_hyperplanes=num_hyperplanes,
+            seed=seed,
+        )
+    elif method == "tree":
+        index = _NeighborIndex(
+            threshold,
+            cat_data=cat_data,
+            num_data=num_data,
+            cat_weights=cat_weights,
+            num_weights=num_weights,
+        )
+
+    labels = np.full(num_transactions, -1)
+    leaders = []
+    pairs_compared = 0
+    candidates = {}
+
+    for pos in range(num_transactions):
+        if labels[pos] >= 0:
+            continue
+
+        if method == "tree":
+            if pos not in candidates:
+                # query the next unlabelled transactions together
+                block = np.flatnonzero(labels[pos : pos + 256] < 0) + pos
+                candidates = index.query(block)
+            remaining = candidates[pos]
+            remaining = np.sort(remaining[(remaining > pos) & (labels[remaining] < 0)])
+        elif method == "lsh":
+            remaining = index.query(pos)
+            remaining = remaining[(remaining > pos) & (labels[remaining] < 0)]
+        else:
+            remaining = np.flatnonzero(labels[pos + 1 :] < 0) + pos + 1
+        labels[pos] = len(leaders)
+        pairs_compared += len(remaining)
+        if len(remaining):
+            if method == "lsh":
+                dots = onehot[remaining] @ onehot[pos].T
+                distances = dots.toarray().ravel() / (
+                    index.norms[remaining] * index.norms[pos]
+                )
+            elif similarity == "euclidean":
+                distances = euclidean(
+                    pos,
+                    remaining,
+                    cat_data=cat_data,
+                    num_data=num_data,
+                    cat_weights=cat_weights,
+                    num_weights=num_weights,
+                )
+            else:
+                distances = cosine_similarity(pos, remaining, transactions=onehot)
+            labels[remaining[distances >= threshold]] = len(leaders)
+        leaders.append(pos)
+
+    return labels, np.array(leaders, dtype=np.int64), pairs_compared
+
+
+def _blocks(transactions, n_blocks, partition_by=None):
+    r"""Split transactions into blocks of at most ``len(transactions) / n_blocks``.
+
+    If ``partition_by`` is given, the transactions with the same value of that
+    feature are kept together and blocks never mix values.
+
+    Returns:
+        list[numpy.ndarray]: Indices of the transactions in each block.
+
+    """
+    num_transactions = len(transactions)
+    block_size = max(1, -(-num_transactions // n_blocks))
+    if partition_by is None:
+        groups = [np.arange(num_transactions)]
+    else:
+        keys = (
+            transactions[partition_by]
+            .astype("category")
+            .cat.codes.to_numpy()
+            .astype(np.int64)
+        )
+        order = np.argsort(keys, kind="stable")
+        groups = np.split(order, np.flatnonzero(np.diff(keys[order])) + 1)
+    return [
+        group[start : start + block_size]
+        for group in groups
+        for start in range(0, len(group), block_size)
+    ]
+
+
+def squash(
+    dataset,
+    threshold,
+    similarity="euclidean",
+    method="exhaustive",
+    *,
+    num_tables=8,
+    num_hyperplanes=16,
+    seed=None,
+    n_jobs=1,
+    partition_by=None,
+    return_info=False,
+):
     """Squash dataset.
 
+    Similar transactions are merged into a single transaction, which is weighted by
+    the number of merged transactions, so that rule metrics computed on the
+    squashed dataset approximate those on the original one. If the dataset is
+    already weighted, the weights are summed and the merged values are weighted
+    means and modes.
+
+    With several jobs or a ``partition_by`` feature, the transactions are split
+    into blocks that are squashed independently (in a process pool if
+    ``n_jobs > 1``). A final pass then merges the clusters across blocks whose
+    first transactions are similar (through KD-trees for euclidean similarity),
+    so the result approximates the squashing of the whole dataset.
+
     Args:
         dataset (Dataset): Dataset to squash.
         threshold (float): Similarity threshold. Should be between 0 and 1.
         similarity (Literal["euclidean", "cosine"]): Similarity measure for comparing
          transactions (euclidean or cosine). Default: 'euclidean'.
+        method (Literal["exhaustive", "tree", "lsh"]): How similar transactions are
+         found. 'exhaustive' compares every pair of transactions. 'tree' compares
+         only the neighbours found in KD-trees over the numerical features, which
+         gives the same result in about O(n log n) for euclidean similarity. 'lsh'
+         compares only the transactions hashed to the same bucket by random
+         hyperplanes in a sparse one-hot encoding, which is approximate and works
+         for cosine similarity only. Default: 'exhaustive'.
+        num_tables (int): Number of hash tables of the 'lsh' method. More tables
+         find more of the similar transactions, but compare more pairs.
+         Default: 8.
+        num_hyperplanes (int): Number of hyperplanes per hash table of the 'lsh'
+         method, at most 64. More hyperplanes give smaller buckets and fewer
+         compared pairs, but miss more of the similar transactions. Default: 16.
+        seed (Optional[int]): Seed of the random hyperplanes. Default: None.
+        n_jobs (int): Number of blocks squashed in parallel processes. ``-1`` uses
+         all CPUs. Default: 1.
+        partition_by (Optional[str]): Name of a feature whose values partition the
+         transactions into blocks, so that transactions with the same value are
+         squashed together. Default: None.
+        return_info (bool): Also return a :class:`SquashInfo` with the number of
+         compared pairs. Default: False.
 
     Returns:
-        Dataset: Squashed dataset.
+        Union[Dataset, tuple[Dataset, SquashInfo]]: Squashed dataset with the
+        cluster sizes as weights, and the squashing summary if ``return_info``
+        is set.
 
     """
     if similarity not in ("euclidean", "cosine"):
         raise ValueError(f"Invalid similarity measure: {similarity}")
+    if method not in ("exhaustive", "tree", "lsh"):
+        raise ValueError(f"Invalid squashing method: {method}")
+    if method == "tree" and similarity != "euclidean":
+        raise ValueError("The tree method supports only euclidean similarity")
+    if method == "lsh" and similarity != "cosine":
+        raise ValueError("The lsh method supports only cosine similarity")
+    if num_tables < 1:
+        raise ValueError(f"Invalid number of hash tables: {num_tables}")
+    # the signs of the projections are packed into 64-bit bucket keys
+    if not 1 <= num_hyperplanes <= 64:
+        raise ValueError(
+            f"Invalid number of hyperplanes: {num_hyperplanes}, should be 1-64"
+        )
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if n_jobs < 1:
+        raise ValueError(f"Invalid number of jobs: {n_jobs}")
+    if partition_by is not None and partition_by not in dataset.header:
+        raise ValueError(f"Invalid partition feature: {partition_by}")
 
     transactions = dataset.transactions
     num_transactions = len(transactions)
+    if num_transactions == 0:
+        raise ValueError("No transactions to squash")
+    data = _encode(dataset, similarity, method)
+    options = {
+        "num_tables": num_tables,
+        "num_hyperplanes": num_hyperplanes,
+        "seed": seed,
+    }
 
-    if similarity == "cosine":
-        transactions_onehot = pd.get_dummies(transactions).to_numpy(dtype=np.float64)
+    blocks = _blocks(transactions, n_jobs, partition_by)
+    if len(blocks) == 1:
+        labels, leaders, pairs_compared = _cluster(
+            threshold, similarity, method, **data, **options
+        )
     else:
-        features = dataset.features
-
-        cat_features = [f for f in features if f.dtype == "cat"]
-        num_features = [f for f in features if f.dtype != "cat"]
+        subsets = [_subset(data, rows) for rows in blocks]
+        if n_jobs > 1:
+            with ProcessPoolExecutor(n_jobs) as executor:
+                futures = [
+                    executor.submit(
+                        _cluster, threshold, similarity, method, **subset, **options
+                    )
+                    for subset in subsets
+                ]
+                results = [future.result() for future in futures]
+        else:
+            results = [
+                _cluster(threshold, similarity, method, **subset, **options)
+                for subset in subsets
+            ]
 
-        cat_weights = (
-            np.array([1 / len(f.categories) ** 2 for f in cat_features])
-            if cat_features
-            else None
+        # merge the clusters of all blocks whose leaders are similar, through the
+        # KD-trees for euclidean similarity, which find the same pairs as
+        # comparing every pair of leaders
+        all_leaders = np.concatenate(
+            [
+                rows[leaders]
+                for rows, (_, leaders, _) in zip(blocks, results, strict=True)
+            ]
         )
-        num_weights = (
-            np.array([(1 / (f.max_val - f.min_val)) ** 2 for f in num_features])
-            if num_features
-            else None
+        merge_method = "tree" if similarity == "euclidean" else method
+        merged, leaders, pairs_compared = _cluster(
+            threshold,
+            similarity,
+            merge_method,
+            **_subset(data, all_leaders),
+            **options,
         )
+        leaders = all_leaders[leaders]
+        labels = np.empty(num_transactions, dtype=np.int64)
+        offset = 0
+        for rows, (block_labels, block_leaders, block_pairs) in zip(
+            blocks, results, strict=True
+        ):
+            labels[rows] = merged[offset + block_labels]
+            offset += len(block_leaders)
+            pairs_compared += block_pairs
 
-        cat_data = (
-            transactions[[f.name for f in cat_features]].to_numpy()
-            if cat_features
-            else None
-        )
-        num_data = (
-            transactions[[f.name for f in num_features]].to_numpy()
-            if num_features
-            else None
-        )
+    num_clusters = len(leaders)
+    weights = (
+        np.ones(num_transactions, dtype=np.int64)
+        if dataset.weights is None
+        else dataset.weights
+    )
+    squashed_transactions = _aggregate(transactions, labels, num_clusters, weights)
+    squashed_weights = np.bincount(labels, weights, num_clusters).astype(np.int64)
+    squashed = Dataset(
+        squashed_transactions, weights=squashed_weights, bin_edges=dataset.bin_edges
+    )
+    if return_info:
+        return squashed, SquashInfo(num_transactions, num_clusters, pairs_compared)
+    return squashed
 
-    squashed = np.zeros(num_transactions, dtype=bool)
-    squashed_transactions = pd.DataFrame(columns=transactions.columns, dtype=int)
 
-    for pos in range(num_transactions):
-        if squashed[pos]:
-            continue
+class _Prototypes:
+    r"""Bounded set of cluster prototypes for streaming squashing.
+
+    Every prototype keeps the transaction that started it (its leader) and the
+    running sums, counts and category counts of the transactions merged into it.
+    A transaction joins the first prototype whose leader is similar to it, which
+    gives the same clusters as :func:`squash`, or starts a new prototype. Once
+    ``max_prototypes`` prototypes exist, it joins the most similar one instead.
+
+    The column types are taken from the first chunk. The numerical ranges and the
+    numbers of categories that scale the euclidean distance are those of all
+    transactions read so far, so a file sorted by a feature is squashed like a
+    shuffled one. A feature without a range so far doesn't add to the distance.
+
+    """
+
+    def __init__(self, first_chunk, threshold, similarity, max_prototypes):
+        self.threshold = threshold
+        self.similarity = similarity
+        self.max_prototypes = max_prototypes
+        self.columns = first_chunk.columns.tolist()
+        self.num_columns = []
+        self.cat_columns = []
+        self.integer = {}
+        for name in self.columns:
+            column = first_chunk[name]
+            if is_bool_dtype(column) or is_integer_dtype(column):
+                self.num_columns.append(name)
+                self.integer[name] = True
+            elif is_float_dtype(column):
+                self.num_columns.append(name)
+                self.integer[name] = False
+            else:
+                self.cat_columns.append(name)
+        self.categories = [{} for _ in self.cat_columns]
 
-        remaining = np.where(~squashed[pos + 1 :])[0] + pos + 1
+        self.num_min = np.full(len(self.num_columns), np.inf)
+        self.num_max = np.full(len(self.num_columns), -np.inf)
 
-        if len(remaining) == 0:
-            squashed[pos] = True
-            squashed_transaction = transactions.iloc[pos]
-            squashed_transactions = pd.concat(
-                [squashed_transactions, pd.DataFrame([squashed_transaction])],
-                ignore_index=True,
+        self.size = 0
+        capacity = 16
+        self.leader_num = np.empty((capacity, len(self.num_columns)))
+        self.leader_cat = np.empty((capacity, len(self.cat_columns)), dtype=np.int64)
+        self.leader_norms = np.empty(capacity)
+        self.sums = np.zeros((capacity, len(self.num_columns)))
+        self.present = np.zeros((capacity, len(self.num_columns)))
+        self.counts = np.zeros(capacity, dtype=np.int64)
+        self.cat_counts = [np.zeros((capacity, 0)) for _ in self.cat_columns]
+        self.num_transactions = 0
+        self.pairs_compared = 0
+
+    def _encode(self, chunk):
+        r"""Get the numerical values and category codes of a chunk."""
+        num_data = np.column_stack(
+            [chunk[name].to_numpy(dtype=np.float64) for name in self.num_columns]
+            or [np.empty((len(chunk), 0))]
+        )
+        cat_data = np.empty((len(chunk), len(self.cat_columns)), dtype=np.int64)
+        for i, name in enumerate(self.cat_columns):
+            column = chunk[name].astype("category")
+            categories = self.categories[i]
+            mapping = np.array(
+                [
+                    categories.setdefault(c, len(categories))
+                    for c in column.cat.categories
+                ]
+                + [-1],
+                dtype=np.int64,
             )
-            continue
+            cat_data[:, i] = mapping[column.cat.codes.to_numpy()]
+        for name in self.num_columns:
+            if not (is_bool_dtype(chunk[name]) or is_integer_dtype(chunk[name])):
+                self.integer[name] = False
+        return num_data, cat_data
 
-        if similarity == "euclidean":
-            distances = euclidean(
-                pos,
-                remaining,
-                cat_data=cat_data,
-                num_data=num_data,
-                cat_weights=cat_weights,
-                num_weights=num_weights,
+    def _rescale(self, num_data):
+        r"""Update the euclidean distance weights with the ranges read so far."""
+        with np.errstate(invalid="ignore"):
+            self.num_min = np.fmin(
+                self.num_min, np.nanmin(num_data, axis=0, initial=np.inf)
+            )
+            self.num_max = np.fmax(
+                self.num_max, np.nanmax(num_data, axis=0, initial=-np.inf)
+            )
+        ranges = self.num_max - self.num_min
+        with np.errstate(divide="ignore"):
+            self.num_weights = np.where(ranges > 0, 1 / ranges**2, 0.0)
+            self.cat_weights = (
+                1
+                / np.array(
+                    [len(categories) for categories in self.categories],
+                    dtype=np.float64,
+                )
+                ** 2
             )
+
+    def _norms(self, num_data, cat_data):
+        r"""Norms of transactions in the one-hot encoding of cosine similarity."""
+        return np.sqrt(np.sum(num_data**2, axis=1) + np.sum(cat_data >= 0, axis=1))
+
+    def _similarities(self, num_data, cat_data, norms, start, stop, skip_missing=False):
+        r"""Similarities of transactions to the leaders ``start:stop``.
+
+        Missing numerical values make a similarity nan, unless ``skip_missing``
+        is set, in which case they are left out.
+
+        """
+        leader_num = self.leader_num[start:stop]
+        leader_cat = self.leader_cat[start:stop]
+        self.pairs_compared += len(num_data) * (stop - start)
+        if self.similarity == "euclidean":
+            dist = np.zeros((len(num_data), stop - start))
+            for j, weight in enumerate(self.cat_weights):
+                mismatch = (cat_data[:, j, None] != leader_cat[:, j]) | (
+                    cat_data[:, j, None] < 0
+                )
+                dist += mismatch * weight
+            for j, weight in enumerate(self.num_weights):
+                diff = (num_data[:, j, None] - leader_num[:, j]) ** 2 * weight
+                dist += np.nan_to_num(diff, nan=0.0) if skip_missing else diff
+            return 1 - np.sqrt(dist)
+        if skip_missing:
+            num_data = np.nan_to_num(num_data, nan=0.0)
+            leader_num = np.nan_to_num(leader_num, nan=0.0)
+            norms = self._norms(num_data, cat_data)
+            leader_norms = self._norms(leader_num, leader_cat)
         else:
-            distances = cosine_similarity(
-                pos, remaining, transactions=transactions_onehot
+            leader_norms = self.leader_norms[start:stop]
+        dots = num_data @ leader_num.T
+        for j in range(len(self.cat_columns)):
+            dots += (cat_data[:, j, None] == leader_cat[:, j]) & (
+                cat_data[:, j, None] >= 0
+            )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return dots / (norms[:, None] * leader_norms)
+
+    def _nearest(self, num_data, cat_data, norms):
+        r"""Index of the most similar prototype of each transaction.
+
+        Missing values are left out, so a transaction with missing values joins
+        the prototype most similar in its other features.
+
+        """
+        similarities = self._similarities(
+            num_data, cat_data, norms, 0, self.size, skip_missing=True
+        )
+        # transactions without any values are not similar to any prototype
+        return np.nan_to_num(similarities, nan=-np.inf).argmax(axis=1)
+
+    def _grow(self, num_categories):
+        r"""Make room for another prototype and for new categories."""
+        capacity = len(self.counts)
+        if self.size == capacity:
+            capacity *= 2
+        rows = capacity - len(self.counts)
+        self.leader_num = np.pad(self.leader_num, ((0, rows), (0, 0)))
+        self.leader_cat = np.pad(self.leader_cat, ((0, rows), (0, 0)))
+        self.leader_norms = np.pad(self.leader_norms, (0, rows))
+        self.sums = np.pad(self.sums, ((0, rows), (0, 0)))
+        self.present = np.pad(self.present, ((0, rows), (0, 0)))
+        self.counts = np.pad(self.counts, (0, rows))
+        self.cat_counts = [
+            np.pad(counts, ((0, rows), (0, size - counts.shape[1])))
+            for counts, size in zip(self.cat_counts, num_categories, strict=True)
+        ]
+
+    def add(self, chunk, block_size=2**20):
+        r"""Merge a chunk of transactions into the prototypes."""
+        num_data, cat_data = self._encode(chunk)
+        self._rescale(num_data)
+        norms = self._norms(num_data, cat_data)
+        self._grow([len(categories) for categories in self.categories])
+        labels = np.empty(len(chunk), dtype=np.int64)
+
+        # compare blocks of transactions to the existing leaders at once, with
+        # small blocks while there are few leaders, as the transactions that
+        # start new leaders are compared one by one
+        start = 0
+        while start < len(chunk):
+            step = min(block_size // max(self.size, 1), 16 * self.size + 64)
+            stop = min(start + max(step, 1), len(chunk))
+            num_leaders = self.size
+            if num_leaders:
+                similarities = self._similarities(
+                    num_data[start:stop],
+                    cat_data[start:stop],
+                    norms[start:stop],
+                    0,
+                    num_leaders,
+                )
+                similar = similarities >= self.threshold
+                matched = similar.any(axis=1)
+                if num_leaders < self.max_prototypes:
+                    labels[start:stop] = np.where(matched, similar.argmax(axis=1), -1)
+                else:
+                    # no more leaders, the others join the most similar prototype
+                    labels[start:stop] = similar.argmax(axis=1)
+                    others = np.flatnonzero(~matched)
+                    if len(others):
+                        rows = others + start
+                        labels[rows] = self._nearest(
+                            num_data[rows], cat_data[rows], norms[rows]
+                        )
+            else:
+                labels[start:stop] = -1
+
+            # the others only need the leaders started within the block
+            for pos in np.flatnonzero(labels[start:stop] < 0) + start:
+                rows = slice(pos, pos + 1)
+                if self.size > num_leaders:
+                    similarities = self._similarities(
+                        num_data[rows],
+                        cat_data[rows],
+                        norms[rows],
+                        num_leaders,
+                        self.size,
+                    )[0]
+                    similar = np.flatnonzero(similarities >= self.threshold)
+                    if len(similar):
+                        labels[pos] = num_leaders + similar[0]
+                        continue
+                if self.size < self.max_prototypes:
+                    if self.size == len(self.counts):
+                        self._grow([counts.shape[1] for counts in self.cat_counts])
+                    self.leader_num[self.size] = num_data[pos]
+                    self.leader_cat[self.size] = cat_data[pos]
+                    self.leader_norms[self.size] = norms[pos]
+                    labels[pos] = self.size
+                    self.size += 1
+                else:
+                    labels[pos] = self._nearest(
+                        num_data[rows], cat_data[rows], norms[rows]
+                    )[0]
+            start = stop
+
+        capacity = len(self.counts)
+        present = ~np.isnan(num_data)
+        for j in range(len(self.num_columns)):
+            rows = present[:, j]
+            self.sums[:, j] += np.bincount(labels[rows], num_data[rows, j], capacity)
+            self.present[:, j] += np.bincount(labels[rows], minlength=capacity)
+        self.counts += np.bincount(labels, minlength=capacity)
+        for j, counts in enumerate(self.cat_counts):
+            rows = cat_data[:, j] >= 0
+            num_categories = counts.shape[1]
+            counts += np.bincount(
+                labels[rows] * num_categories + cat_data[rows, j],
+                minlength=capacity * num_categories,
+            ).reshape(capacity, num_categories)
+        self.num_transactions += len(chunk)
+
+    def dataset(self):
+        r"""Get the squashed dataset of the prototypes."""
+        columns = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.sums[: self.size] / self.present[: self.size]
+        for j, name in enumerate(self.num_columns):
+            columns[name] = (
+                np.round(means[:, j]).astype(np.int64)
+                if self.integer[name]
+                else means[:, j]
             )
+        for j, name in enumerate(self.cat_columns):
+            # break ties in favour of the first category in sorted order, as
+            # pandas orders the categories of a categorical feature
+            categories = pd.Index(list(self.categories[j]))
+            order = categories.argsort()
+            counts = self.cat_counts[j][: self.size, order]
+            modes = counts.argmax(axis=1)
+            modes[counts.max(axis=1, initial=0) == 0] = -1
+            columns[name] = pd.Categorical.from_codes(
+                modes, categories=categories[order]
+            ).remove_unused_categories()
+        transactions = pd.DataFrame(columns)[self.columns]
+        return Dataset(transactions, weights=self.counts[: self.size])
+
+
+def squash_csv(
+    path,
+    threshold,
+    similarity="euclidean",
+    *,
+    chunksize=100_000,
+    max_prototypes=10_000,
+    delimiter=",",
+    header=0,
+    names=None,
+    return_info=False,
+):
+    """Squash a csv file in a single pass over chunks of it.
+
+    Only one chunk and at most ``max_prototypes`` cluster prototypes are kept in
+    memory, so files that don't fit in memory can be squashed before mining.
+    Every transaction joins the first prototype whose first transaction is similar
+    to it, like in :func:`squash`, and prototypes keep running means, modes and
+    counts of their transactions. Once ``max_prototypes`` prototypes exist,
+    transactions join the most similar prototype.
+
+    The numerical ranges and the numbers of categories that scale the euclidean
+    distance are those of all transactions read so far, so the result equals
+    :func:`squash` of the whole file if it fits into the first chunk, no
+    numerical feature is constant and ``max_prototypes`` is not reached. A
+    feature that is constant so far doesn't add to the distance, while
+    :func:`squash` considers no two transactions similar if a feature is
+    constant in the whole dataset. A file without transactions raises a
+    ValueError.
+
+    Args:
+        path (str | os.PathLike): Path to the csv file.
+        threshold (float): Similarity threshold. Should be between 0 and 1.
+        similarity (Literal["euclidean", "cosine"]): Similarity measure for comparing
+         transactions (euclidean or cosine). Default: 'euclidean'.
+        chunksize (int): Number of transactions read at once. Default: 100000.
+        max_prototypes (int): Maximum number of squashed transactions.
+         Default: 10000.
+        delimiter (str): The delimiter in the csv file. Default: ','.
+        header (int | None): Row to use as header (zero-based). Default: 0.
+        names (list[str] | None): List of feature names to use. Default: None.
+        return_info (bool): Also return a :class:`SquashInfo` with the number of
+         compared pairs. Default: False.
 
-        similar_mask = distances >= threshold
-        similar_indices = remaining[similar_mask]
+    Returns:
+        Union[Dataset, tuple[Dataset, SquashInfo]]: Squashed dataset with the
+        cluster sizes as weights, and the squashing summary if ``return_info``
+        is set.
 
-        squashed[pos] = True
-        squashed[similar_indices] = True
+    """
+    if similarity not in ("euclidean", "cosine"):
+        raise ValueError(f"Invalid similarity measure: {similarity}")
+    if max_prototypes < 1:
+        raise ValueError("max_prototypes should be at least 1")
 
-        all_indices = np.concatenate([[pos], similar_indices])
-        squashed_set = transactions.iloc[all_indices]
-        squashed_transaction = squashed_set.agg(mean_or_mode)
+    prototypes = None
+    with pd.read_csv(
+        path, delimiter=delimiter, header=header, names=names, chunksize=chunksize
+    ) as reader:
+        for chunk in reader:
+            if names is None and header is None:
+                chunk.columns = pd.Index(
+                    [f"Feature{i}" for i in range(len(chunk.columns))]
+                )
+            if prototypes is None:
+                prototypes = _Prototypes(chunk, threshold, similarity, max_prototypes)
+            prototypes.add(chunk)
 
-        squashed_transactions = pd.concat(
-            [squashed_transactions, pd.DataFrame([squashed_transaction])],
-            ignore_index=True,
+    if prototypes is None or prototypes.num_transactions == 0:
+        raise ValueError(f"No transactions to squash in {path}")
+    squashed = prototypes.dataset()
+    if return_info:
+        return squashed, SquashInfo(
+            prototypes.num_transactions, prototypes.size, prototypes.pairs_compared
         )
+    return squashed
+
+
+def discretize(dataset, bins=10, strategy="quantile", features=None):
+    """Discretize numerical features into ordered bins.
+
+    The values of every discretized feature are replaced by the indices of their
+    bins, so that rules are searched over ranges of bins instead of continuous
+    intervals. The bin edges are kept in ``bin_edges`` of the returned dataset,
+    and :func:`undiscretize` maps the mined rules back to the original units.
+    Missing values stay missing, with the bin indices of such features stored as
+    nullable integers. A constant feature gets a single bin.
+
+    Args:
+        dataset (Dataset): Dataset to discretize.
+        bins (int): Number of bins per feature. Bins with equal edges are joined,
+         so features with few distinct values may get fewer bins. Default: 10.
+        strategy (Literal["quantile", "uniform"]): 'quantile' gives bins with about
+         the same number of transactions (weighted by ``dataset.weights``) and
+         'uniform' gives bins of the same width. Default: 'quantile'.
+        features (list[str] | None): Names of the numerical features to discretize.
+         Default: None (all numerical features).
+
+    Returns:
+        Dataset: Dataset with the bin indices of the discretized features.
+
+    """
+    if strategy not in ("quantile", "uniform"):
+        raise ValueError(f"Invalid discretization strategy: {strategy}")
+    if bins < 1:
+        raise ValueError(f"Invalid number of bins: {bins}")
+
+    transactions = dataset.transactions.copy()
+    bin_edges = dict(dataset.bin_edges)
+    for feature in dataset.features:
+        if feature.dtype == "cat" or (
+            features is not None and feature.name not in features
+        ):
+            continue
+        values = transactions[feature.name].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        if not present.any():
+            continue
+        if strategy == "uniform":
+            edges = np.linspace(feature.min_val, feature.max_val, bins + 1)
+        elif dataset.weights is None:
+            edges = np.quantile(values[present], np.linspace(0, 1, bins + 1))
+        else:
+            edges = np.quantile(
+                values[present],
+                np.linspace(0, 1, bins + 1),
+                weights=dataset.weights[present],
+                method="inverted_cdf",
+            )
+        if feature.dtype == "int":
+            # whole number edges give integer features the same bins, without
+            # the empty ones, and let undiscretize map them back to integers
+            edges = np.ceil(edges).astype(np.int64)
+        edges = np.unique(edges)
+        if len(edges) == 1:
+            # a constant feature gets a single bin holding its value
+            edges = np.repeat(edges, 2)
+
+        # bin i holds the values in [edges[i], edges[i + 1]), the last one is closed
+        codes = np.searchsorted(edges[1:-1], values, side="right")
+        if present.all():
+            transactions[feature.name] = codes
+        else:
+            # nullable integers, so missing values don't turn the codes into floats
+            transactions[feature.name] = pd.arrays.IntegerArray(codes, ~present)
+        bin_edges[feature.name] = edges
+
+    return Dataset(
+        transactions,
+        weights=dataset.weights,
+        bin_edges=bin_edges,
+        block_size=dataset.block_size,
+    )
+
+
+def undiscretize(rules, bin_edges):
+    """Map rules mined on a discretized dataset back to the original units.
+
+    The ranges of bins of discretized features are replaced by the intervals
+    holding the same values: from the lower edge of the first bin to just below
+    the upper edge of the last bin, or up to the upper edge if it is the last
+    bin of the feature. Integer features (with integer edges) are mapped to
+    integer intervals. The metrics of the rules are kept, as the rules cover the
+    same transactions of the original dataset.
+
+    Args:
+        rules (RuleList): Rules mined on a dataset returned by :func:`discretize`.
+        bin_edges (dict[str, numpy.ndarray]): Bin edges of the discretized dataset
+         (see :attr:`Dataset.bin_edges <niaarm.dataset.Dataset>`).
+
+    Returns:
+        RuleList: Rules with features in the original units.
+
+    """
+
+    def original(feature):
+        edges = bin_edges.get(feature.name)
+        if edges is None or feature.dtype == "cat":
+            return feature
+        first, last = int(feature.min_val), int(feature.max_val)
+        lower, upper = edges[first], edges[last + 1]
+        # bins are half-open, except for the last one
+        integer = np.issubdtype(edges.dtype, np.integer)
+        if last + 2 < len(edges):
+            upper = upper - 1 if integer else np.nextafter(upper, -np.inf)
+        if integer:
+            return Feature(feature.name, "int", int(lower), int(upper))
+        return Feature(feature.name, "float", float(lower), float(upper))
 
-    return Dataset(squashed_transactions)
+    mapped = RuleList()
+    for rule in rules:
+        rule = copy.copy(rule)
+        rule.antecedent = [original(feature) for feature in rule.antecedent]
+        rule.consequent = [original(feature) for feature in rule.consequent]
+        mapped.append(rule)
+    return mapped
@@ -1,6 +1,6 @@
 import math
 
-import numpy as np
+from niaarm.store import TransactionStore
 
 
 class Rule:
@@ -10,7 +10,9 @@ class Rule:
         antecedent (list[Feature]): A list of antecedents of the association rule.
         consequent (list[Feature]): A list of consequents of the association rule.
         fitness (float | None): Fitness value of the association rule.
-        transactions (pandas.DataFrame | None): Transactional database.
+        transactions (pandas.DataFrame | TransactionStore | None): Transactional
+         database. The columns of a DataFrame referenced by the rule are compiled into
+         a :class:`TransactionStore` first.
 
     Attributes:
         cls.metrics (tuple[str]): List of all available interestingness measures.
@@ -261,64 +263,48 @@ class Rule:
         self.not_ant_not_con = 0
 
         if transactions is not None:
-            self.num_transactions = len(transactions)
-            self.__inclusion = (len(self.antecedent) + len(self.consequent)) / len(
-                transactions.columns
-            )
+            if not isinstance(transactions, TransactionStore):
+                # compile only the columns the rule refers to, but keep the
+                # number of features of the whole DataFrame for the inclusion
+                names = list(
+                    dict.fromkeys(feature.name for feature in antecedent + consequent)
+                )
+                num_features = transactions.shape[1]
+                transactions = TransactionStore(transactions[names], cache_bytes=0)
+                transactions.num_features = num_features
             self.__post_init__(transactions)
 
-    def __post_init__(self, transactions):
-        min_ = transactions.min(numeric_only=True)
-        max_ = transactions.max(numeric_only=True)
-        acc = 0
-        contains_antecedent = np.ones(self.num_transactions, dtype=bool)
-        for attribute in self.antecedent:
-            if attribute.dtype != "cat":
-                feature_min = min_[attribute.name]
-                feature_max = max_[attribute.name]
-                acc += (
-                    1
-                    if feature_max == feature_min
-                    else (attribute.max_val - attribute.min_val)
-                    / (feature_max - feature_min)
-                )
-                contains_antecedent &= (
-                    (transactions[attribute.name] <= attribute.max_val)
-                    & (transactions[attribute.name] >= attribute.min_val)
-                ).to_numpy()
-            else:
-                contains_antecedent &= np.isin(
-                    transactions[attribute.name], attribute.categories
-                )
+    def __post_init__(self, transactions, counts=None):
+        r"""Compute the rule's statistics on the transactions.
 
-        self.antecedent_count = contains_antecedent.sum()
+        Args:
+            transactions (TransactionStore): Compiled transactional database.
+            counts (tuple[int, int, int] | None): Precomputed numbers of transactions
+             containing the antecedent, the consequent and both. If ``None``, they are
+             counted on ``transactions``.
 
-        contains_consequent = np.ones(self.num_transactions, dtype=bool)
+        """
+        self.num_transactions = transactions.num_transactions
+        self.__inclusion = (
+            len(self.antecedent) + len(self.consequent)
+        ) / transactions.num_features
 
-        for attribute in self.consequent:
-            if attribute.dtype != "cat":
-                feature_min = min_[attribute.name]
-                feature_max = max_[attribute.name]
-                acc += (
-                    1
-                    if feature_max == feature_min
-                    else (attribute.max_val - attribute.min_val)
-                    / (feature_max - feature_min)
-                )
-                contains_consequent &= (
-                    (transactions[attribute.name] <= attribute.max_val)
-                    & (transactions[attribute.name] >= attribute.min_val)
-                ).to_numpy()
-            else:
-                contains_consequent &= np.isin(
-                    transactions[attribute.name], attribute.categories
-                )
-        self.__amplitude = 1 - (1 / (len(self.antecedent) + len(self.consequent))) * acc
-        self.consequent_count = contains_consequent.sum()
-        self.full_count = (contains_antecedent & contains_consequent).sum()
-        self.ant_not_con = (~contains_consequent & contains_antecedent).sum()
-        self.con_not_ant = (contains_consequent & ~contains_antecedent).sum()
-        self.not_ant_not_con = (~contains_antecedent & ~contains_consequent).sum()
+        self.__amplitude = transactions.statistics.amplitude(
+            self.antecedent + self.consequent
+        )
+
+        if counts is None:
+            counts = transactions.counts(self.antecedent, self.consequent)
+
+        self.antecedent_count, self.consequent_count, self.full_count = counts
+        self.ant_not_con = self.antecedent_count - self.full_count
+        self.con_not_ant = self.consequent_count - self.full_count
+        self.not_ant_not_con = (
+            self.num_transactions
+            - self.antecedent_count
+            - self.consequent_count
+            + self.full_count
+        )
 
     @property
     def support(self):
@@ -400,6 +386,14 @@ class Rule:
             * (self.consequent_count / self.num_transactions)
         )
 
+    @property
+    def key(self):
+        """Canonical hashable key of the rule, used for fast duplicate detection."""
+        return (
+            tuple(attribute.key for attribute in self.antecedent),
+            tuple(attribute.key for attribute in self.consequent),
+        )
+
     def __eq__(self, other):
         return (
             self.antecedent == other.antecedent and self.consequent == other.consequent
@@ -0,0 +1,58 @@
+class FeatureStatistics:
+    r"""Precomputed value ranges of a dataset's numerical features.
+
+    A single instance is shared by the dataset's :class:`~niaarm.store.TransactionStore`
+    and all rules evaluated on it, so computing a rule's amplitude only looks up the
+    ranges of the rule's attributes.
+
+    Args:
+        min_values (dict[str, float]): Minimum value of each numerical feature.
+        max_values (dict[str, float]): Maximum value of each numerical feature.
+
+    """
+
+    __slots__ = ("min_values", "max_values")
+
+    def __init__(self, min_values, max_values):
+        self.min_values = min_values
+        self.max_values = max_values
+
+    @classmethod
+    def from_features(cls, features):
+        r"""Collect the ranges stored on a dataset's features.
+
+        Args:
+            features (list[Feature]): Features of a dataset.
+
+        Returns:
+            FeatureStatistics: Statistics of the numerical features.
+
+        """
+        numerical = [feature for feature in features if feature.dtype != "cat"]
+        return cls(
+            {feature.name: feature.min_val for feature in numerical},
+            {feature.name: feature.max_val for feature in numerical},
+        )
+
+    def amplitude(self, attributes):
+        r"""Compute the amplitude of a rule's attributes.
+
+        Args:
+            attributes (list[Feature]): Antecedent and consequent of a rule.
+
+        Returns:
+            float: Amplitude of the rule.
+
+        """
+        acc = 0
+        for attribute in attributes:
+            if attribute.dtype != "cat":
+                feature_min = self.min_values[attribute.name]
+                feature_max = self.max_values[attribute.name]
+                acc += (
+                    1
+                    if feature_max == feature_min
+                    else (attribute.max_val - attribute.min_val)
+                    / (feature_max - feature_min)
+                )
+        return 1 - (1 / len(attributes)) * acc
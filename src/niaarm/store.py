@@ -0,0 +1,886 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from niaarm.cache import ItemCache
+from niaarm.statistics import FeatureStatistics
+
+# intervals selecting at most 1/_NARROW of the transactions are materialized from
+# the sorted-rank index, wider ones by comparing the whole column
+_NARROW = 4
+
+# conjunctions selecting at most 1/_SPARSE of the transactions are continued on
+# the indices of the selected rows instead of on bitsets
+_SPARSE = 64
+
+# numerical features with at most _BINNED distinct values (e.g. discretized ones)
+# get cumulative bitsets over their values, from which intervals are AND-NOT-ed
+_BINNED = 32
+
+
+def pack_bits(masks):
+    """Pack boolean masks along the last axis into ``uint64`` words.
+
+    Bits past the end of the masks are zero.
+
+    Args:
+        masks (numpy.ndarray): Boolean array.
+
+    Returns:
+        numpy.ndarray: Array of ``uint64`` words with ``ceil(n / 64)`` words in the
+        last axis, where ``n`` is the length of the masks.
+
+    """
+    packed = np.packbits(masks, axis=-1, bitorder="little")
+    padding = -packed.shape[-1] % 8
+    if padding:
+        packed = np.pad(packed, [(0, 0)] * (packed.ndim - 1) + [(0, padding)])
+    return packed.view(np.uint64)
+
+
+def popcount(bits):
+    """Count the set bits of packed bitsets along the last axis.
+
+    Args:
+        bits (numpy.ndarray): Array of ``uint64`` words.
+
+    Returns:
+        int | numpy.ndarray: Number of set bits.
+
+    """
+    counts = np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    return int(counts) if counts.ndim == 0 else counts
+
+
+class TransactionStore:
+    r"""Columnar NumPy representation of a transaction database.
+
+    The transactions are compiled once into contiguous float arrays for numerical
+    features and integer codes for categorical features, so that rules can be
+    evaluated without going through pandas.
+
+    Args:
+        transactions (pandas.DataFrame): Transactional data.
+        statistics (FeatureStatistics | None): Precomputed value ranges of the
+         numerical features. If ``None``, they are computed from the columns on
+         first access.
+        cache_bytes (int): Memory budget of the item cache in bytes. 0 disables
+         the cache. Default: 64 MiB.
+        rank_index (bool): Build a sorted-rank index of every numerical feature on
+         construction and select the transactions of intervals by binary search
+         instead of comparing whole columns. The index of a feature takes 16 bytes
+         per row, i.e. twice its column. Without it, intervals are counted from
+         their bitsets and cached by their bounds. Default: ``False``.
+        weights (numpy.ndarray | None): Number of transactions each row stands for,
+         e.g. the multiplicities of deduplicated rows. If ``None``, every row is a
+         single transaction.
+
+    Attributes:
+        names (list[str]): Feature names.
+        num_rows (int): Number of stored rows.
+        num_transactions (int): Number of transactions, i.e. the sum of the weights.
+        num_features (int): Number of features.
+        columns (dict[str, numpy.ndarray]): Values of numerical features as float64
+         arrays and category codes of categorical features as int32 arrays.
+         Missing categories are coded as -1.
+        categories (dict[str, dict[str, int]]): Mapping from category to code for
+         each categorical feature.
+        statistics (FeatureStatistics): Value ranges of the numerical features.
+        cache (ItemCache | None): Cache of item bitsets, shared by all rules
+         evaluated on the store.
+        rank_index (bool): Whether intervals are selected through the sorted-rank
+         index.
+        weights (numpy.ndarray | None): Integer weights of the rows. All counts are
+         weighted sums over the rows.
+
+    """
+
+    def __init__(
+        self,
+        transactions,
+        statistics=None,
+        cache_bytes=64 * 2**20,
+        rank_index=False,
+        weights=None,
+    ):
+        columns = {}
+        categories = {}
+        for name in transactions.columns.tolist():
+            col = transactions[name]
+            if is_numeric_dtype(col):
+                columns[name] = np.ascontiguousarray(
+                    col.to_numpy(dtype=np.float64, na_value=np.nan)
+                )
+            else:
+                if not isinstance(col.dtype, pd.CategoricalDtype):
+                    col = col.astype("category")
+                columns[name] = np.ascontiguousarray(
+                    col.cat.codes.to_numpy(), dtype=np.int32
+                )
+                categories[name] = {
+                    category: code
+                    for code, category in enumerate(col.cat.categories.tolist())
+                }
+        self._setup(columns, categories, statistics, cache_bytes, rank_index, weights)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        columns,
+        categories=None,
+        statistics=None,
+        cache_bytes=0,
+        rank_index=False,
+        weights=None,
+    ):
+        """Construct a store from already compiled columns.
+
+        Args:
+            columns (dict[str, numpy.ndarray]): Float64 values or int32 category codes
+             of each feature.
+            categories (dict[str, dict[str, int]] | None): Mapping from category to
+             code for each categorical feature.
+            statistics (FeatureStatistics | None): Value ranges of the numerical
+             features. If ``None``, they are computed on first access.
+            cache_bytes (int): Memory budget of the item cache. Default: 0 (no
+             cache).
+            rank_index (bool): Build sorted-rank indices of the numerical features.
+             Default: ``False``.
+            weights (numpy.ndarray | None): Number of transactions each row stands
+             for. Default: ``None``.
+
+        Returns:
+            TransactionStore: The store. The arrays are used without copying.
+
+        """
+        store = cls.__new__(cls)
+        store._setup(
+            columns, categories or {}, statistics, cache_bytes, rank_index, weights
+        )
+        return store
+
+    def _setup(self, columns, categories, statistics, cache_bytes, rank_index, weights):
+        self.names = list(columns)
+        self.num_rows = len(next(iter(columns.values()))) if columns else 0
+        if weights is not None:
+            weights = np.ascontiguousarray(weights, dtype=np.int64)
+            self.num_transactions = int(weights.sum())
+        else:
+            self.num_transactions = self.num_rows
+        self.weights = weights
+        self.num_features = len(self.names)
+        self.columns = columns
+        self.categories = categories
+        self.cache = ItemCache(cache_bytes) if cache_bytes else None
+        self._statistics = statistics
+        self._indices = {}
+        self._category_counts = {}
+        self._cumulative_weights = {}
+        self._prefix_bits = {}
+        self.rank_index = rank_index
+        if rank_index:
+            for name in self.names:
+                if name not in self.categories:
+                    self.sorted_index(name)
+
+    @property
+    def statistics(self):
+        if self._statistics is None:
+            numerical = [name for name in self.names if name not in self.categories]
+            self._statistics = FeatureStatistics(
+                {name: np.nanmin(self.columns[name]) for name in numerical},
+                {name: np.nanmax(self.columns[name]) for name in numerical},
+            )
+        return self._statistics
+
+    def sorted_index(self, name):
+        """Get the sorted-rank index of a numerical feature.
+
+        The index is built on first access and kept, taking 16 bytes per row.
+
+        Args:
+            name (str): Name of a numerical feature.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Row indices that sort the column
+            and the sorted values. Missing values are sorted last.
+
+        """
+        index = self._indices.get(name)
+        if index is None:
+            column = self.columns[name]
+            order = np.argsort(column, kind="stable")
+            index = order, column[order]
+            self._indices[name] = index
+        return index
+
+    def prefix_bits(self, name):
+        """Get the cumulative bitsets of a numerical feature with few distinct values.
+
+        Row ``k`` of the bitsets holds the transactions whose value is lower than
+        the ``k``-th distinct value, so the transactions within any interval are
+        the AND-NOT of two rows. They are built on first access for features with
+        at most 32 distinct values, such as discretized features.
+
+        Args:
+            name (str): Name of a numerical feature.
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray] | None: Sorted distinct values and
+            the bitsets of shape ``(len(values) + 1, ceil(num_rows / 64))``, or
+            ``None`` if the feature has too many distinct values.
+
+        """
+        if name in self._prefix_bits:
+            return self._prefix_bits[name]
+        if self.rank_index:
+            values = self.sorted_index(name)[1]
+            values = values[~np.isnan(values)]
+            distinct = (
+                values[np.r_[True, values[1:] != values[:-1]]]
+                if len(values)
+                else values
+            )
+        else:
+            column = self.columns[name]
+            distinct = np.unique(column[~np.isnan(column)])
+        prefix = None
+        if len(distinct) <= _BINNED:
+            # missing values are ranked last and never selected
+            ranks = distinct.searchsorted(self.columns[name])
+            masks = ranks < np.arange(len(distinct) + 1)[:, None]
+            prefix = distinct, pack_bits(masks)
+        self._prefix_bits[name] = prefix
+        return prefix
+
+    def interval_counts(self, name, lower, upper):
+        """Count the transactions within intervals by binary search.
+
+        Args:
+            name (str): Name of a numerical feature.
+            lower (float | numpy.ndarray): Lower bounds of the intervals.
+            upper (float | numpy.ndarray): Upper bounds of the intervals.
+
+        Returns:
+            int | numpy.ndarray: Number of transactions within each interval.
+
+        """
+        start, stop = self._value_range(name, lower, upper)
+        return self._range_count(name, start, stop)
+
+    def interval_mask(self, name, lower, upper):
+        """Get a boolean mask of transactions within an interval.
+
+        Args:
+            name (str): Name of a numerical feature.
+            lower (float): Lower bound of the interval.
+            upper (float): Upper bound of the interval.
+
+        Returns:
+            numpy.ndarray: Boolean array of length ``num_rows``.
+
+        """
+        if self.rank_index:
+            start, stop = self._value_range(name, lower, upper)
+            if (stop - start) * _NARROW <= self.num_rows:
+                # only the rows within the interval are touched
+                mask = np.zeros(self.num_rows, dtype=bool)
+                mask[self.sorted_index(name)[0][start:stop]] = True
+                return mask
+        column = self.columns[name]
+        return (column <= upper) & (column >= lower)
+
+    def item_mask(self, item):
+        """Get a boolean mask of transactions containing an item.
+
+        Args:
+            item (Feature): An attribute of an association rule.
+
+        Returns:
+            numpy.ndarray: Boolean array of length ``num_rows``.
+
+        """
+        if item.dtype != "cat":
+            return self.interval_mask(item.name, item.min_val, item.max_val)
+
+        column = self.columns[item.name]
+
+        codes = self.categories.get(item.name)
+        if codes is None:
+            return np.isin(column, item.categories)
+
+        selected = [codes[c] for c in item.categories if c in codes]
+        if len(selected) == 1:
+            return column == selected[0]
+        return np.isin(column, selected)
+
+    def mask(self, items):
+        """Get a boolean mask of transactions containing all items.
+
+        Args:
+            items (list[Feature]): Attributes of an association rule.
+
+        Returns:
+            numpy.ndarray: Boolean array of length ``num_rows``.
+
+        """
+        mask = np.ones(self.num_rows, dtype=bool)
+        for item in items:
+            mask &= self.item_mask(item)
+        return mask
+
+    def item_key(self, item):
+        """Get the cache key of an item.
+
+        With the sorted-rank index, interval bounds are replaced by their positions
+        in the sorted values of the column, so all intervals selecting the same
+        transactions share one key. Without it, intervals are keyed by their
+        bounds.
+
+        Args:
+            item (Feature): An attribute of an association rule.
+
+        Returns:
+            tuple: Key of the item.
+
+        """
+        if item.dtype == "cat":
+            return item.name, frozenset(item.categories)
+
+        if not self.rank_index:
+            return item.name, float(item.min_val), float(item.max_val)
+        return (item.name, *self._value_range(item.name, item.min_val, item.max_val))
+
+    def _value_range(self, name, lower, upper):
+        r"""Get the positions of interval bounds in the sorted values of a column.
+        Empty intervals are mapped to ``(0, 0)``."""
+        values = self.sorted_index(name)[1]
+        start = values.searchsorted(lower, side="left")
+        stop = values.searchsorted(upper, side="right")
+        if np.ndim(start) == 0:
+            return (int(start), int(stop)) if start < stop else (0, 0)
+        empty = start >= stop
+        return np.where(empty, 0, start), np.where(empty, 0, stop)
+
+    def _interval_bits(self, name, lower, upper):
+        r"""Get a packed bitset of transactions within an interval."""
+        prefix = self.prefix_bits(name)
+        if prefix is None:
+            return pack_bits(self.interval_mask(name, lower, upper))
+        values, bits = prefix
+        start = values.searchsorted(lower, side="left")
+        stop = values.searchsorted(upper, side="right")
+        return bits[stop] & ~bits[start]
+
+    def _item_bits(self, item):
+        r"""Compute a packed bitset of transactions containing an item."""
+        if item.dtype != "cat":
+            return self._interval_bits(item.name, item.min_val, item.max_val)
+        return pack_bits(self.item_mask(item))
+
+    def item_bits(self, item, key=None):
+        """Get a packed bitset of transactions containing an item.
+
+        Args:
+            item (Feature): An attribute of an association rule.
+            key (tuple | None): Cache key of the item, if already known.
+
+        Returns:
+            numpy.ndarray: Array of ``uint64`` words, one bit per transaction. It
+            may be shared with the cache and must not be modified.
+
+        """
+        if self.cache is None:
+            return self._item_bits(item)
+        return self.cache.get(key or self.item_key(item), lambda: self._item_bits(item))
+
+    def term_bits(self, term, threshold):
+        """Get a packed bitset of documents whose tf-idf weight of a term exceeds
+        the threshold.
+
+        Args:
+            term (str): Name of a term column.
+            threshold (float): Threshold of tf-idf weights.
+
+        Returns:
+            numpy.ndarray: Array of ``uint64`` words, one bit per document. It may
+            be shared with the cache and must not be modified.
+
+        """
+        if self.cache is None:
+            return pack_bits(self.columns[term] > threshold)
+        return self.cache.get(
+            (term, ">", threshold),
+            lambda: pack_bits(self.columns[term] > threshold),
+        )
+
+    def bits(self, items):
+        """Get a packed bitset of transactions containing all items.
+
+        Args:
+            items (list[Feature]): Attributes of an association rule.
+
+        Returns:
+            numpy.ndarray: Array of ``uint64`` words, one bit per transaction.
+
+        """
+        if not items:
+            return pack_bits(np.ones(self.num_rows, dtype=bool))
+        bits = self.item_bits(items[0]).copy()
+        for item in items[1:]:
+            bits &= self.item_bits(item)
+        return bits
+
+    def item_count(self, item):
+        """Count the transactions containing an item without materializing a mask.
+
+        Numerical items are counted by binary search in the sorted-rank index, or
+        from their cached bitsets without it, and categorical items from the
+        counts of each category.
+
+        Args:
+            item (Feature): An attribute of an association rule.
+
+        Returns:
+            int: Number of transactions containing the item.
+
+        """
+        return self._item_count(item, self.item_key(item))
+
+    def _item_count(self, item, key):
+        r"""Count the transactions containing an item with a known cache key."""
+        if item.dtype != "cat":
+            if not self.rank_index:
+                return self.count(self.item_bits(item, key))
+            return self._range_count(item.name, key[1], key[2])
+
+        codes = self.categories.get(item.name)
+        if codes is None:
+            return self.count(self.item_bits(item, key))
+        counts = self._category_counts.get(item.name)
+        if counts is None:
+            column = self.columns[item.name]
+            present = column >= 0
+            weights = None if self.weights is None else self.weights[present]
+            counts = np.bincount(column[present], weights, len(codes)).astype(np.int64)
+            self._category_counts[item.name] = counts
+        return int(sum(counts[codes[c]] for c in set(item.categories) if c in codes))
+
+    def _range_count(self, name, start, stop):
+        r"""Count the transactions between two positions of the sorted-rank index."""
+        if self.weights is None:
+            return stop - start
+        cumulative = self._cumulative_weights.get(name)
+        if cumulative is None:
+            cumulative = np.zeros(self.num_rows + 1, dtype=np.int64)
+            np.cumsum(self.weights[self.sorted_index(name)[0]], out=cumulative[1:])
+            self._cumulative_weights[name] = cumulative
+        counts = cumulative[stop] - cumulative[start]
+        return int(counts) if np.ndim(counts) == 0 else counts
+
+    def count(self, bits):
+        """Count the transactions of packed bitsets along the last axis.
+
+        Args:
+            bits (numpy.ndarray): Array of ``uint64`` words, one bit per row.
+
+        Returns:
+            int | numpy.ndarray: Number of transactions, weighted if the store has
+            weights.
+
+        """
+        if self.weights is None:
+            return popcount(bits)
+        mask = np.unpackbits(
+            bits.view(np.uint8), axis=-1, count=self.num_rows, bitorder="little"
+        )
+        counts = mask @ self.weights
+        return int(counts) if np.ndim(counts) == 0 else counts
+
+    def rows_count(self, rows):
+        """Count the transactions of rows given by their indices.
+
+        Args:
+            rows (numpy.ndarray): Row indices.
+
+        Returns:
+            int: Number of transactions, weighted if the store has weights.
+
+        """
+        if self.weights is None:
+            return len(rows)
+        return int(self.weights[rows].sum())
+
+    def item_rows(self, item, rows):
+        """Select the rows containing an item from candidate rows.
+
+        Args:
+            item (Feature): An attribute of an association rule.
+            rows (numpy.ndarray): Indices of the candidate rows.
+
+        Returns:
+            numpy.ndarray: Indices of the candidate rows containing the item.
+
+        """
+        values = self.columns[item.name][rows]
+        if item.dtype != "cat":
+            return rows[(values <= item.max_val) & (values >= item.min_val)]
+
+        codes = self.categories.get(item.name)
+        if codes is None:
+            return rows[np.isin(values, item.categories)]
+        selected = [codes[c] for c in item.categories if c in codes]
+        if len(selected) == 1:
+            return rows[values == selected[0]]
+        return rows[np.isin(values, selected)]
+
+    def _conjunction(self, items):
+        r"""Select the transactions containing all items.
+
+        The items are intersected from the most to the least selective one and
+        the intersection continues on row indices once few rows are left.
+
+        Returns:
+            tuple[int, numpy.ndarray | None, numpy.ndarray | None]: Number of
+            selected transactions and either their packed bitset or their row
+            indices.
+
+        """
+        if not items:
+            return self.num_transactions, self.bits(items), None
+
+        keys = [self.item_key(item) for item in items]
+        counts = [
+            self._item_count(item, key) for item, key in zip(items, keys, strict=True)
+        ]
+        order = sorted(range(len(items)), key=counts.__getitem__)
+        items = [items[i] for i in order]
+        keys = [keys[i] for i in order]
+        count = counts[order[0]]
+        if count == 0:
+            return 0, None, np.empty(0, dtype=np.intp)
+
+        sparse = count * _SPARSE <= self.num_transactions
+        if sparse and items[0].dtype != "cat" and self.rank_index:
+            _, start, stop = keys[0]
+            rows = self.sorted_index(items[0].name)[0][start:stop]
+        elif sparse:
+            rows = np.flatnonzero(self.item_mask(items[0]))
+        else:
+            bits = self.item_bits(items[0], keys[0]).copy()
+            for i, item in enumerate(items[1:], 1):
+                bits &= self.item_bits(item, keys[i])
+                count = self.count(bits)
+                if count * _SPARSE <= self.num_transactions and i < len(items) - 1:
+                    mask = np.unpackbits(bits.view(np.uint8), bitorder="little")
+                    rows = np.flatnonzero(mask[: self.num_rows])
+                    items = items[i:]
+                    break
+            else:
+                return count, bits, None
+
+        for item in items[1:]:
+            if not len(rows):
+                break
+            rows = self.item_rows(item, rows)
+        return self.rows_count(rows), None, rows
+
+    def counts(self, antecedent, consequent, skip_empty=False):
+        """Count the transactions containing the antecedent, the consequent and both.
+
+        The items of each side are intersected in order of their selectivity, on
+        packed bitsets while many transactions remain and on row indices once few
+        remain. The remaining cells of the contingency table follow from the counts
+        and the number of transactions.
+
+        Args:
+            antecedent (list[Feature]): Antecedent of an association rule.
+            consequent (list[Feature]): Consequent of an association rule.
+            skip_empty (bool): Don't count the consequent if no transaction contains
+             the antecedent and report its count as 0. Default: ``False``.
+
+        Returns:
+            tuple[int, int, int]: Antecedent, consequent and full counts.
+
+        """
+        antecedent_count, antecedent_bits, antecedent_rows = self._conjunction(
+            antecedent
+        )
+        if antecedent_count == 0 and skip_empty:
+            return 0, 0, 0
+        consequent_count, consequent_bits, consequent_rows = self._conjunction(
+            consequent
+        )
+
+        if antecedent_count == 0 or consequent_count == 0:
+            full_count = 0
+        elif antecedent_rows is None and consequent_rows is None:
+            full_count = self.count(antecedent_bits & consequent_bits)
+        elif antecedent_rows is not None and consequent_rows is not None:
+            full_count = self.rows_count(
+                np.intersect1d(antecedent_rows, consequent_rows, assume_unique=True)
+            )
+        else:
+            rows = antecedent_rows if antecedent_rows is not None else consequent_rows
+            bits = antecedent_bits if antecedent_bits is not None else consequent_bits
+            shift = (rows & 63).astype(np.uint64)
+            full_count = self.rows_count(rows[(bits[rows >> 6] >> shift) & 1 != 0])
+        return antecedent_count, consequent_count, full_count
+
+    def term_counts(self, antecedent, consequent, threshold):
+        """Count the documents containing the antecedent, the consequent and both.
+
+        Args:
+            antecedent (list[str]): Antecedent terms of a text rule.
+            consequent (list[str]): Consequent terms of a text rule.
+            threshold (float): Threshold of tf-idf weights.
+
+        Returns:
+            tuple[int, int, int]: Antecedent, consequent and full counts.
+
+        """
+        contains_antecedent = self.term_bits(antecedent[0], threshold).copy()
+        for term in antecedent[1:]:
+            contains_antecedent &= self.term_bits(term, threshold)
+        contains_consequent = self.term_bits(consequent[0], threshold).copy()
+        for term in consequent[1:]:
+            contains_consequent &= self.term_bits(term, threshold)
+        return (
+            self.count(contains_antecedent),
+            self.count(contains_consequent),
+            self.count(contains_antecedent & contains_consequent),
+        )
+
+    def interval_masks(self, name, lower, upper):
+        """Get boolean masks of transactions within each of several intervals.
+
+        Args:
+            name (str): Name of a numerical feature.
+            lower (numpy.ndarray): Lower bounds of the intervals.
+            upper (numpy.ndarray): Upper bounds of the intervals.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape ``(len(lower), num_rows)``.
+
+        """
+        column = self.columns[name]
+        if not self.rank_index:
+            return (column <= upper[:, None]) & (column >= lower[:, None])
+
+        start, stop = self._value_range(name, lower, upper)
+        narrow = (stop - start) * _NARROW <= self.num_rows
+        masks = np.zeros((len(lower), self.num_rows), dtype=bool)
+        wide = np.flatnonzero(~narrow)
+        masks[wide] = (column <= upper[wide, None]) & (column >= lower[wide, None])
+        order = self.sorted_index(name)[0]
+        for j in np.flatnonzero(narrow).tolist():
+            masks[j, order[start[j] : stop[j]]] = True
+        return masks
+
+    def interval_bits(self, name, lower, upper):
+        """Get packed bitsets of transactions within each of several intervals.
+
+        Args:
+            name (str): Name of a numerical feature.
+            lower (numpy.ndarray): Lower bounds of the intervals.
+            upper (numpy.ndarray): Upper bounds of the intervals.
+
+        Returns:
+            numpy.ndarray: Array of ``uint64`` words of shape
+            ``(len(lower), ceil(num_rows / 64))``.
+
+        """
+        prefix = self.prefix_bits(name)
+        if prefix is not None:
+            values, bits = prefix
+            start = values.searchsorted(lower, side="left")
+            stop = values.searchsorted(upper, side="right")
+            # populations repeat few distinct intervals of a binned feature
+            _, first, inverse = np.unique(
+                start * (len(values) + 1) + stop, return_index=True, return_inverse=True
+            )
+            return (bits[stop[first]] & ~bits[start[first]])[inverse]
+        if self.cache is None:
+            return pack_bits(self.interval_masks(name, lower, upper))
+
+        if self.rank_index:
+            start, stop = self._value_range(name, lower, upper)
+            _, first, inverse = np.unique(
+                start * (self.num_rows + 1) + stop,
+                return_index=True,
+                return_inverse=True,
+            )
+            keys = [(name, int(start[j]), int(stop[j])) for j in first]
+        else:
+            bounds = np.column_stack((lower, upper)).astype(np.float64)
+            _, first, inverse = np.unique(
+                bounds, axis=0, return_index=True, return_inverse=True
+            )
+            keys = [(name, float(lower[j]), float(upper[j])) for j in first]
+        bits = [
+            self.cache.get(
+                key,
+                lambda j=j: pack_bits(self.interval_mask(name, lower[j], upper[j])),
+            )
+            for key, j in zip(keys, first, strict=True)
+        ]
+        return np.stack(bits)[inverse.ravel()]
+
+    def category_bits(self, name, categories):
+        """Get packed bitsets of transactions containing each of several categories.
+
+        Args:
+            name (str): Name of a categorical feature.
+            categories (list[str]): One category per bitset.
+
+        Returns:
+            numpy.ndarray: Array of ``uint64`` words of shape
+            ``(len(categories), ceil(num_rows / 64))``.
+
+        """
+        if self.cache is None:
+            return pack_bits(self.category_masks(name, categories))
+
+        distinct, inverse = np.unique(np.asarray(categories), return_inverse=True)
+        bits = [
+            self.cache.get(
+                (name, frozenset((category,))),
+                lambda category=category: pack_bits(
+                    self.category_masks(name, [category])[0]
+                ),
+            )
+            for category in distinct.tolist()
+        ]
+        return np.stack(bits)[inverse]
+
+    def category_masks(self, name, categories):
+        """Get boolean masks of transactions containing each of several categories.
+
+        Args:
+            name (str): Name of a categorical feature.
+            categories (list[str]): One category per mask.
+
+        Returns:
+            numpy.ndarray: Boolean array of shape
+            ``(len(categories), num_rows)``.
+
+        """
+        column = self.columns[name]
+        codes = self.categories.get(name)
+        if codes is None:
+            return column == np.asarray(categories)[:, None]
+        # -2 never occurs in the codes, so unknown categories match nothing
+        selected = np.array([codes.get(category, -2) for category in categories])
+        return column == selected[:, None]
+
+
+class _Block(TransactionStore):
+    r"""Rows of a :class:`BlockStore`, evaluated by comparing their columns only.
+
+    A block lives for a single evaluation, so sorting it for an index or cumulative
+    bitsets would cost more than the comparisons they save."""
+
+    def prefix_bits(self, name):
+        return None
+
+    def _conjunction(self, items):
+        bits = self.bits(items)
+        return self.count(bits), bits, None
+
+
+class BlockStore(TransactionStore):
+    r"""Transaction store whose rules are evaluated block by block.
+
+    Counting a rule reads the columns in contiguous blocks of rows and sums the
+    counts of the blocks, so the temporary masks and bitsets only ever cover one
+    block. For compiled in-memory columns, blocks of about 2**16 rows keep the
+    working set of an evaluation in the CPU caches. For :class:`numpy.memmap`
+    columns, e.g. of a dataset loaded with
+    :meth:`~niaarm.dataset.Dataset.load_compiled`, the operating system pages the
+    columns in and out sequentially, so datasets larger than the memory can be
+    mined.
+
+    Args:
+        columns (dict[str, numpy.ndarray]): Values of numerical features and category
+         codes of categorical features, of any numeric dtype. They are converted to
+         float64 values and int32 codes one block at a time.
+        categories (dict[str, dict[str, int]] | None): Mapping from category to code
+         for each categorical feature.
+        statistics (FeatureStatistics | None): Value ranges of the numerical
+         features. If ``None``, they are computed from the columns on first access.
+        weights (numpy.ndarray | None): Number of transactions each row stands for.
+         Default: ``None``.
+        block_size (int): Number of rows per block. Default: 2**18.
+
+    Attributes:
+        block_size (int): Number of rows per block.
+
+    """
+
+    def __init__(
+        self, columns, categories=None, statistics=None, weights=None, block_size=2**18
+    ):
+        if block_size < 1:
+            raise ValueError(f"Invalid block size: {block_size}")
+        self.block_size = block_size
+        self._setup(columns, categories or {}, statistics, 0, False, weights)
+
+    def blocks(self):
+        """Iterate over the blocks of rows.
+
+        Yields:
+            TransactionStore: Store of the next ``block_size`` rows, with compiled
+            columns. It doesn't cache or index anything.
+
+        """
+        for start in range(0, self.num_rows, self.block_size):
+            stop = min(start + self.block_size, self.num_rows)
+            columns = {
+                name: np.ascontiguousarray(
+                    column[start:stop],
+                    dtype=np.int32 if name in self.categories else np.float64,
+                )
+                for name, column in self.columns.items()
+            }
+            yield _Block.from_arrays(
+                columns,
+                self.categories,
+                self._statistics,
+                weights=None if self.weights is None else self.weights[start:stop],
+            )
+
+    def reduce(self, function, *args):
+        r"""Call ``function(block, *args)`` on every block and sum the results.
+
+        Args:
+            function (Callable): Function taking a :class:`TransactionStore` as the
+             first argument and returning a tuple of counts.
+            args: Additional arguments passed to ``function``.
+
+        Returns:
+            tuple: Element-wise sums of the results of all blocks.
+
+        """
+        results = [function(block, *args) for block in self.blocks()]
+        return tuple(sum(values) for values in zip(*results, strict=True))
+
+    def counts(self, antecedent, consequent, skip_empty=False):
+        """Count the transactions containing the antecedent, the consequent and both.
+
+        Same as :meth:`TransactionStore.counts`, but summed over the blocks.
+
+        """
+        counts = self.reduce(TransactionStore.counts, antecedent, consequent)
+        if skip_empty and counts[0] == 0:
+            return 0, 0, 0
+        return counts
+
+    def term_counts(self, antecedent, consequent, threshold):
+        """Count the documents containing the antecedent, the consequent and both.
+
+        Same as :meth:`TransactionStore.term_counts`, but summed over the blocks.
+
+        """
+        return self.reduce(
+            TransactionStore.term_counts, antecedent, consequent, threshold
+        )
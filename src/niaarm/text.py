@@ -271,11 +271,22 @@ class TextRule(Rule):
             )
             self.__post_init__(transactions, threshold)
 
-    def __post_init__(self, transactions, threshold=0):
+    def __post_init__(self, transactions, threshold=0, counts=None):
         self.__inclusion = (len(self.antecedent) + len(self.consequent)) / len(
             transactions.columns
         )
         self.__aws = transactions[self.antecedent + self.consequent].values.sum()
+        if counts is not None:
+            self.antecedent_count, self.consequent_count, self.full_count = counts
+            self.ant_not_con = self.antecedent_count - self.full_count
+            self.con_not_ant = self.consequent_count - self.full_count
+            self.not_ant_not_con = (
+                self.num_transactions
+                - self.antecedent_count
+                - self.consequent_count
+                + self.full_count
+            )
+            return
         contains_antecedent = (transactions[self.antecedent] > threshold).all(axis=1)
         contains_consequent = (transactions[self.consequent] > threshold).all(axis=1)
         self.antecedent_count = contains_antecedent.sum()
@@ -297,6 +308,10 @@ class TextRule(Rule):
     def aws(self):
         return self.__aws
 
+    @property
+    def key(self):
+        return tuple(self.antecedent), tuple(self.consequent)
+
 
 class NiaARTM(NiaARM):
     r"""Representation of Association Rule Text Mining as an optimization problem.
@@ -321,6 +336,8 @@ class NiaARTM(NiaARM):
          If a weight is less than or equal to the threshold,
          the term is not included in the transaction. Default: 0.
         logging (bool): Enable logging of fitness improvements. Default: ``False``.
+        memo_size (int): Maximum number of rules whose fitness is memoized.
+         Default: 65536.
 
     Attributes:
         rules (RuleList): A list of mined text rules.
@@ -339,18 +356,44 @@ class NiaARTM(NiaARM):
     )
 
     def __init__(
-        self, max_terms, terms, transactions, metrics, threshold=0, logging=False
+        self,
+        max_terms,
+        terms,
+        transactions,
+        metrics,
+        threshold=0,
+        logging=False,
+        memo_size=2**16,
     ):
-        super().__init__(max_terms + 1, terms, transactions, metrics, logging)
+        super().__init__(
+            max_terms + 1, terms, transactions, metrics, logging, memo_size
+        )
         self.max_terms = max_terms
         self.threshold = threshold
 
-    def build_rule(self, vector):
-        terms = [self.features[int(val * (self.num_features - 1))] for val in vector]
+    def _init_decoding(self):
+        r"""Precompute the largest term index a gene decodes to."""
+        self._max_term = self.num_features - 1
+
+    def decode(self, vectors):
+        r"""Decode solution vectors into term indices.
+
+        Args:
+            vectors (numpy.ndarray): Solutions without the cut point, of shape
+             ``(num_solutions, max_terms)``.
 
+        Returns:
+            numpy.ndarray: Index of the term selected by each gene, of the same
+            shape as ``vectors``.
+
+        """
+        return (np.asarray(vectors) * self._max_term).astype(int)
+
+    def build_rule(self, vector):
         seen = set()
         rule = []
-        for term in terms:
+        for i in self.decode([vector])[0].tolist():
+            term = self.features[i]
             if term in seen:
                 continue
             rule.append(term)
@@ -358,41 +401,103 @@ class NiaARTM(NiaARM):
 
         return rule
 
-    def _evaluate(self, x):
-        cut_value = x[self.dimension - 1]
-        solution = x[:-1]
+    def evaluate_population(self, population):
+        r"""Evaluate a population of solutions at once.
 
-        rule = self.build_rule(solution)
-        cut = _cut_point(cut_value, len(rule))
+        Rules that are neither memoized nor repeated earlier in the population are
+        counted together, in a single round trip to the pool if there is one.
+        Feasible rules are archived in the same order as if the solutions were
+        evaluated one by one.
 
-        antecedent = rule[:cut]
-        consequent = rule[cut:]
+        Args:
+            population (numpy.ndarray): Solutions of shape
+             ``(population_size, dimension)``.
 
-        if antecedent and consequent:
-            rule = TextRule(
-                antecedent,
-                consequent,
-                transactions=self.transactions,
-                threshold=self.threshold,
+        Returns:
+            numpy.ndarray: Fitness of each solution.
+
+        """
+        population = np.asarray(population)
+        if population.ndim != 2 or population.shape[1] != self.dimension:
+            raise ValueError(
+                f"Dimensions do not match. {population.shape[-1]} != {self.dimension}"
             )
-            metrics = [getattr(rule, metric) for metric in self.metrics]
-            fitness = np.dot(self.weights, metrics) / self.sum_weights
-            rule.fitness = fitness
-
-            if rule.support > 0.0 and rule.confidence > 0.0 and rule not in self.rules:
-                self.rules.append(rule)
-
-                if self.logging and fitness > self.best_fitness:
-                    self.best_fitness = fitness
-                    print(
-                        f"Fitness: {rule.fitness}, "
-                        + ", ".join(
-                            [
-                                f"{metric.capitalize()}: {metrics[i]}"
-                                for i, metric in enumerate(self.metrics)
-                            ]
-                        )
-                    )
+
+        fitness = np.full(len(population), -1.0)
+        keys = {}
+        pending = {}
+        for p, x in enumerate(population):
+            antecedent, consequent = self._split(x)
+            if not (antecedent and consequent):
+                continue
+            key = (tuple(antecedent), tuple(consequent))
+            if key in pending:
+                # evaluated one by one, the repeated rule would be memoized by now
+                self.memo.hits += 1
+            else:
+                value = self.memo.get(key)
+                if value is not None:
+                    fitness[p] = value
+                    continue
+                pending[key] = p
+            keys[p] = key
+
+        rules = [TextRule(list(a), list(c)) for a, c in pending]
+        if self.pool is not None:
+            # a single round trip to the workers for the whole population
+            counts = self.pool.reduce(_term_counts, rules, self.threshold)
+        else:
+            counts = _term_counts(self.store, rules, self.threshold)
+
+        for j, (key, rule) in enumerate(zip(pending, rules, strict=True)):
+            p = pending[key]
+            rule.num_transactions = self.store.num_transactions
+            rule.__post_init__(
+                self.transactions,
+                self.threshold,
+                (counts[0][j], counts[1][j], counts[2][j]),
+            )
+            fitness[p] = self._record(rule)
+            self.memo.put(key, fitness[p])
+
+        # repeated rules take the fitness of their first occurrence
+        for p, key in keys.items():
+            if pending[key] != p:
+                fitness[p] = fitness[pending[key]]
+        return fitness
+
+    def _split(self, x):
+        r"""Decode a solution into the antecedent and consequent terms."""
+        rule = self.build_rule(x[:-1])
+        cut = _cut_point(x[self.dimension - 1], len(rule))
+        return rule[:cut], rule[cut:]
+
+    def _evaluate(self, x):
+        antecedent, consequent = self._split(x)
+
+        if antecedent and consequent:
+            key = (tuple(antecedent), tuple(consequent))
+            fitness = self.memo.get(key)
+            if fitness is not None:
+                return fitness
+
+            # a single rule is counted here, a round trip to the pool costs more
+            counts = self.store.term_counts(antecedent, consequent, self.threshold)
+            rule = TextRule(antecedent, consequent)
+            rule.num_transactions = self.store.num_transactions
+            rule.__post_init__(self.transactions, self.threshold, counts)
+            fitness = self._record(rule)
+            self.memo.put(key, fitness)
             return fitness
         else:
             return -1.0
+
+
+def _term_counts(store, rules, threshold):
+    r"""Count documents containing the antecedents, consequents and whole rules of
+    several text rules, each with
+    :meth:`~niaarm.store.TransactionStore.term_counts`."""
+    counts = np.zeros((3, len(rules)), dtype=np.int64)
+    for j, rule in enumerate(rules):
+        counts[:, j] = store.term_counts(rule.antecedent, rule.consequent, threshold)
+    return tuple(counts)
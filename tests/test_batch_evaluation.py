@@ -0,0 +1,94 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+from niapy.algorithms.basic import DifferentialEvolution, ParticleSwarmOptimization
+from niapy.task import OptimizationType, Task
+
+from niaarm import Dataset, NiaARM, get_rules
+from niaarm.mine import PopulationTask
+
+
+class TestBatchEvaluation(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.metrics = ("support", "confidence", "amplitude", "inclusion")
+        self.population = np.random.default_rng(42).uniform(
+            size=(200, self.data.dimension)
+        )
+
+    def problem(self):
+        return NiaARM(
+            self.data.dimension,
+            self.data.features,
+            self.data.store,
+            self.metrics,
+        )
+
+    def test_matches_serial_evaluation(self):
+        serial = self.problem()
+        batch = self.problem()
+
+        expected = np.array([serial.evaluate(x) for x in self.population])
+        fitness = batch.evaluate_population(self.population)
+
+        np.testing.assert_array_equal(fitness, expected)
+        self.assertGreater(len(batch.rules), 0)
+        self.assertEqual(
+            [repr(rule) for rule in batch.rules], [repr(rule) for rule in serial.rules]
+        )
+        self.assertEqual(
+            [rule.full_count for rule in batch.rules],
+            [rule.full_count for rule in serial.rules],
+        )
+
+    def test_population_task(self):
+        task = Task(
+            self.problem(),
+            max_evals=150,
+            optimization_type=OptimizationType.MAXIMIZATION,
+        )
+        population_task = PopulationTask(
+            self.problem(),
+            max_evals=150,
+            optimization_type=OptimizationType.MAXIMIZATION,
+        )
+
+        expected = np.array([task.eval(x) for x in self.population])
+        fitness = population_task.eval_population(self.population)
+
+        np.testing.assert_array_equal(fitness, expected)
+        self.assertEqual(population_task.evals, task.evals)
+        self.assertEqual(population_task.x_f, task.x_f)
+        self.assertTrue(np.all(fitness[150:] == np.inf))
+
+    def test_batch_evolve_matches_one_by_one(self):
+        class OneByOne(DifferentialEvolution):
+            # overriding evolve opts out of batched generations
+            def evolve(self, pop, xb, task, **kwargs):
+                return super().evolve(pop, xb, task, **kwargs)
+
+        expected = get_rules(
+            self.data, OneByOne(population_size=20, seed=3), self.metrics, 500
+        )
+        result = get_rules(
+            self.data,
+            DifferentialEvolution(population_size=20, seed=3),
+            self.metrics,
+            500,
+        )
+        self.assertEqual(
+            [(repr(rule), rule.fitness) for rule in result.rules],
+            [(repr(rule), rule.fitness) for rule in expected.rules],
+        )
+
+    def test_algorithm_without_evolve(self):
+        result = get_rules(
+            self.data,
+            ParticleSwarmOptimization(population_size=10, seed=3),
+            self.metrics,
+            100,
+        )
+        self.assertGreater(len(result.rules), 0)
@@ -0,0 +1,184 @@
+import os
+import pickle
+from unittest import TestCase
+
+import numpy as np
+
+from niaarm import Dataset, Feature, NiaARM, get_rules
+from niaarm.cache import FitnessMemo, ItemCache
+from niaarm.mine import Result
+from niaarm.store import TransactionStore
+
+
+class TestItemCache(TestCase):
+    def test_hits_and_misses(self):
+        cache = ItemCache()
+        bits = np.arange(4, dtype=np.uint64)
+        self.assertIs(cache.get("a", lambda: bits), bits)
+        self.assertIs(cache.get("a", lambda: bits.copy()), bits)
+        info = cache.info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.nbytes, bits.nbytes)
+
+    def test_lru_eviction(self):
+        cache = ItemCache(max_bytes=64)
+        for key in "abc":
+            cache.get(key, lambda: np.zeros(3, dtype=np.uint64))
+        cache.get("a", lambda: np.zeros(3, dtype=np.uint64))
+        cache.get("d", lambda: np.zeros(3, dtype=np.uint64))
+        self.assertEqual(len(cache), 2)
+        self.assertIn("a", cache)
+        self.assertIn("d", cache)
+        self.assertLessEqual(cache.nbytes, 64)
+
+    def test_too_large(self):
+        cache = ItemCache(max_bytes=8)
+        cache.get("a", lambda: np.zeros(2, dtype=np.uint64))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.nbytes, 0)
+
+
+class TestFitnessMemo(TestCase):
+    def test_get_and_put(self):
+        memo = FitnessMemo(max_size=2)
+        self.assertIsNone(memo.get("a"))
+        memo.put("a", 0.5)
+        memo.put("b", 0.25)
+        self.assertEqual(memo.get("a"), 0.5)
+        memo.put("c", 0.75)
+        self.assertNotIn("b", memo)
+        info = memo.info()
+        self.assertEqual((info.hits, info.misses, info.size), (1, 1, 2))
+        self.assertEqual(info.hit_rate, 0.5)
+
+    def test_disabled(self):
+        memo = FitnessMemo(max_size=0)
+        memo.put("a", 0.5)
+        self.assertIsNone(memo.get("a"))
+        self.assertEqual(len(memo), 0)
+
+
+class TestStoreCache(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+
+    def test_equivalent_intervals_share_key(self):
+        store = TransactionStore(self.data.transactions, rank_index=True)
+        rings = store.columns["Rings"]
+        a = Feature("Rings", dtype="int", min_val=4.6, max_val=9.2)
+        b = Feature("Rings", dtype="int", min_val=5, max_val=9)
+        self.assertEqual(store.item_key(a), store.item_key(b))
+        empty = Feature("Rings", dtype="int", min_val=30.5, max_val=30.7)
+        self.assertEqual(store.item_key(empty), ("Rings", 0, 0))
+
+        store.item_bits(a)
+        bits = store.item_bits(b)
+        self.assertEqual(store.cache.info().hits, 1)
+        np.testing.assert_array_equal(
+            np.unpackbits(bits.view(np.uint8), bitorder="little")[: len(rings)],
+            (rings >= 5) & (rings <= 9),
+        )
+
+    def test_counts_with_and_without_cache(self):
+        cached = TransactionStore(self.data.transactions)
+        uncached = TransactionStore(self.data.transactions, cache_bytes=0)
+        self.assertIsNone(uncached.cache)
+        antecedent = [
+            Feature("Sex", dtype="cat", categories=["M"]),
+            Feature("Length", dtype="float", min_val=0.2, max_val=0.5),
+        ]
+        consequent = [Feature("Rings", dtype="int", min_val=5, max_val=12)]
+        expected = uncached.counts(antecedent, consequent)
+        self.assertEqual(cached.counts(antecedent, consequent), expected)
+        # cached bitsets must not be modified by the AND of the items
+        self.assertEqual(cached.counts(antecedent, consequent), expected)
+        self.assertEqual(cached.cache.info().misses, 3)
+
+    def test_no_index_without_rank_index(self):
+        store = TransactionStore(self.data.transactions)
+        item = Feature("Rings", dtype="int", min_val=5, max_val=9)
+        self.assertEqual(store.item_key(item), ("Rings", 5.0, 9.0))
+        antecedent = [Feature("Length", dtype="float", min_val=0.2, max_val=0.5)]
+        ranked = TransactionStore(self.data.transactions, rank_index=True)
+        self.assertEqual(
+            store.counts(antecedent, [item]), ranked.counts(antecedent, [item])
+        )
+        lower, upper = np.array([0.2, 0.3, 0.2]), np.array([0.5, 0.6, 0.5])
+        np.testing.assert_array_equal(
+            store.interval_bits("Length", lower, upper),
+            ranked.interval_bits("Length", lower, upper),
+        )
+        # intervals are counted without sorting the columns
+        self.assertEqual(store._indices, {})
+
+    def test_population_with_and_without_cache(self):
+        population = np.random.default_rng(2).uniform(size=(40, self.data.dimension))
+        metrics = ("support", "confidence")
+        fitness = []
+        for cache_bytes in (0, 2**20):
+            store = TransactionStore(self.data.transactions, cache_bytes=cache_bytes)
+            problem = NiaARM(self.data.dimension, self.data.features, store, metrics)
+            fitness.append(problem.evaluate_population(population))
+            fitness.append(problem.evaluate_population(population))
+        for values in fitness[1:]:
+            np.testing.assert_array_equal(values, fitness[0])
+
+
+class TestFitnessMemoization(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.metrics = ("support", "confidence", "amplitude")
+
+    def problem(self, memo_size=2**16):
+        return NiaARM(
+            self.data.dimension,
+            self.data.features,
+            self.data.store,
+            self.metrics,
+            memo_size=memo_size,
+        )
+
+    def test_repeated_rules_are_memoized(self):
+        population = np.random.default_rng(3).uniform(size=(30, self.data.dimension))
+        population = np.concatenate((population, population))
+        memoized = self.problem()
+        uncached = self.problem(memo_size=0)
+
+        fitness = memoized.evaluate_population(population)
+        expected = np.array([uncached.evaluate(x) for x in population])
+        np.testing.assert_array_equal(fitness, expected)
+        self.assertEqual(
+            [repr(rule) for rule in memoized.rules],
+            [repr(rule) for rule in uncached.rules],
+        )
+        self.assertGreaterEqual(memoized.memo.hits, 30 - np.sum(fitness[:30] == -1))
+        self.assertEqual(uncached.memo.hits, 0)
+
+        hits = memoized.memo.hits
+        self.assertEqual(memoized.evaluate(population[0]), fitness[0])
+        if fitness[0] != -1:
+            self.assertEqual(memoized.memo.hits, hits + 1)
+
+    def test_result_statistics(self):
+        result = get_rules(
+            self.data, "DifferentialEvolution", self.metrics, max_evals=500, seed=1
+        )
+        rules, run_time = result
+        self.assertIs(rules, result.rules)
+        self.assertGreater(result.memo.hits + result.memo.misses, 0)
+        self.assertLessEqual(result.memo.hit_rate, 1.0)
+
+    def test_result_keeps_statistics(self):
+        result = get_rules(
+            self.data, "DifferentialEvolution", self.metrics, max_evals=100, seed=1
+        )
+        replaced = result._replace(run_time=0.0)
+        self.assertEqual(replaced.run_time, 0.0)
+        self.assertEqual(replaced.memo, result.memo)
+        self.assertEqual(pickle.loads(pickle.dumps(result)).memo, result.memo)
+        self.assertIsNone(Result._make(result).memo)
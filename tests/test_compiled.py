@@ -0,0 +1,226 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+import numpy as np
+import pandas as pd
+
+from niaarm import NiaARM, cli, get_rules
+from niaarm.dataset import Dataset
+from niaarm.preprocessing import discretize
+from niaarm.store import BlockStore
+
+
+class TestCompiled(TestCase):
+    def setUp(self):
+        self.path = os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def assert_same(self, loaded, expected):
+        self.assertEqual(loaded.header, expected.header)
+        self.assertEqual(loaded.features, expected.features)
+        self.assertEqual(loaded.dimension, expected.dimension)
+        self.assertTrue(loaded.transactions.equals(expected.transactions))
+        pd.testing.assert_series_equal(
+            loaded.transactions.dtypes, expected.transactions.dtypes
+        )
+
+    def test_round_trip(self):
+        data = Dataset(self.path)
+        path = os.path.join(self.tmp.name, "abalone")
+        data.save_compiled(path)
+        for mmap in (True, False):
+            loaded = Dataset.load_compiled(path, mmap=mmap)
+            self.assert_same(loaded, data)
+            self.assertIsNone(loaded.weights)
+
+    def test_weights_and_bin_edges(self):
+        data = discretize(Dataset(self.path, weights=np.arange(4177.0)), bins=4)
+        path = os.path.join(self.tmp.name, "abalone")
+        data.save_compiled(path)
+        loaded = Dataset.load_compiled(path)
+        self.assert_same(loaded, data)
+        np.testing.assert_array_equal(loaded.weights, data.weights)
+        self.assertEqual(loaded.bin_edges.keys(), data.bin_edges.keys())
+        for name, edges in data.bin_edges.items():
+            np.testing.assert_array_equal(loaded.bin_edges[name], edges)
+
+    def test_non_string_categories(self):
+        data = Dataset(
+            pd.DataFrame(
+                {
+                    "day": pd.to_datetime(["2024-01-02", "2024-01-01", "2024-01-02"]),
+                    "size": pd.Categorical([3, 1, 3]),
+                }
+            ).astype({"day": "category"})
+        )
+        path = os.path.join(self.tmp.name, "dates")
+        data.save_compiled(path)
+        loaded = Dataset.load_compiled(path)
+        self.assert_same(loaded, data)
+        self.assertEqual(loaded.features[0].categories, data.features[0].categories)
+
+    def test_mixed_categories(self):
+        data = Dataset(pd.DataFrame({"a": pd.Categorical(["x", 1, "x"])}))
+        with self.assertRaises(ValueError):
+            data.save_compiled(os.path.join(self.tmp.name, "mixed"))
+
+    def test_same_rules(self):
+        data = Dataset(self.path)
+        path = os.path.join(self.tmp.name, "abalone")
+        data.save_compiled(path)
+        loaded = Dataset.load_compiled(path)
+        expected, _ = get_rules(
+            data, "DifferentialEvolution", ("support",), max_evals=500, seed=1
+        )
+        rules, _ = get_rules(
+            loaded, "DifferentialEvolution", ("support",), max_evals=500, seed=1
+        )
+        self.assertEqual(
+            [(r.antecedent, r.consequent, r.support) for r in rules],
+            [(r.antecedent, r.consequent, r.support) for r in expected],
+        )
+
+
+class TestCliCache(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.dict(
+            os.environ, {"XDG_CACHE_HOME": os.path.join(self.tmp.name, "cache")}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = os.path.join(self.tmp.name, "data.csv")
+        pd.read_csv(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        ).to_csv(self.path, index=False)
+
+    def test_cache_hit(self):
+        data = cli.load_dataset(self.path)
+        with mock.patch.object(Dataset, "__init__") as init:
+            cached = cli.load_dataset(self.path)
+            init.assert_not_called()
+        self.assertTrue(cached.transactions.equals(data.transactions))
+        self.assertEqual(cached.features, data.features)
+
+    def test_invalidated_on_change(self):
+        cli.load_dataset(self.path)
+        pd.read_csv(self.path).head(100).to_csv(self.path, index=False)
+        self.assertEqual(len(cli.load_dataset(self.path).transactions), 100)
+        self.assertEqual(len(cli.load_dataset(self.path).transactions), 100)
+
+    def test_block_size(self):
+        data = cli.load_dataset(self.path, block_size=1000)
+        self.assertIsInstance(data.store, BlockStore)
+        self.assertIsInstance(
+            cli.load_dataset(self.path, block_size=1000).store, BlockStore
+        )
+        data = cli.load_dataset(self.path, cache=False, block_size=1000)
+        self.assertIsInstance(data.store, BlockStore)
+
+    def test_replaced_entry(self):
+        cli.load_dataset(self.path)
+        os.utime(self.path, ns=(0, 0))
+        self.assertEqual(len(cli.load_dataset(self.path).transactions), 4177)
+        self.assertEqual(len(os.listdir(cli.cache_dir())), 1)
+
+    def test_uncached_fallback(self):
+        with mock.patch.object(
+            Dataset, "save_compiled", side_effect=ValueError("mixed")
+        ):
+            data = cli.load_dataset(self.path, block_size=1000)
+        self.assertEqual(len(data.transactions), 4177)
+        self.assertIsInstance(data.store, BlockStore)
+        self.assertEqual(os.listdir(cli.cache_dir()), [])
+
+    def test_no_cache(self):
+        cli.load_dataset(self.path, cache=False)
+        self.assertFalse(os.path.exists(cli.cache_dir()))
+
+
+class TestBlockStore(TestCase):
+    def setUp(self):
+        self.path = os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.metrics = ("support", "confidence", "amplitude")
+
+    def load(self, data, block_size):
+        path = os.path.join(self.tmp.name, "compiled")
+        data.save_compiled(path)
+        return Dataset.load_compiled(path, block_size=block_size)
+
+    def test_counts_match_store(self):
+        data = Dataset(self.path)
+        blocked = self.load(data, 1000)
+        self.assertIsInstance(blocked.store, BlockStore)
+        self.assertEqual(len(list(blocked.store.blocks())), 5)
+        rules, _ = get_rules(
+            data, "DifferentialEvolution", self.metrics, max_evals=500, seed=1
+        )
+        for rule in rules:
+            self.assertEqual(
+                blocked.store.counts(rule.antecedent, rule.consequent),
+                data.store.counts(rule.antecedent, rule.consequent),
+            )
+
+    def test_population_matches_store(self):
+        data = Dataset(self.path)
+        blocked = self.load(data, 1000)
+        population = np.random.default_rng(1).uniform(size=(50, data.dimension))
+        expected = NiaARM(data.dimension, data.features, data.store, self.metrics)
+        problem = NiaARM(data.dimension, data.features, blocked.store, self.metrics)
+        np.testing.assert_array_equal(
+            problem.evaluate_population(population),
+            expected.evaluate_population(population),
+        )
+        np.testing.assert_array_equal(
+            [problem.evaluate(x) for x in population],
+            [expected.evaluate(x) for x in population],
+        )
+        self.assertEqual(
+            [repr(rule) for rule in problem.rules],
+            [repr(rule) for rule in expected.rules],
+        )
+
+    def test_weighted_and_parallel(self):
+        data = Dataset(pd.read_csv(self.path)[["Sex", "Rings"]], deduplicate=True)
+        blocked = self.load(data, 7)
+        expected, _ = get_rules(
+            data, "DifferentialEvolution", self.metrics, max_evals=300, seed=1
+        )
+        for n_jobs in (1, 2):
+            rules, _ = get_rules(
+                blocked,
+                "DifferentialEvolution",
+                self.metrics,
+                max_evals=300,
+                seed=1,
+                n_jobs=n_jobs,
+            )
+            self.assertEqual(
+                [(r.key, r.support, r.confidence) for r in rules],
+                [(r.key, r.support, r.confidence) for r in expected],
+            )
+
+    def test_in_memory(self):
+        data = Dataset(self.path)
+        blocked = Dataset(self.path, block_size=512)
+        self.assertIsInstance(blocked.store, BlockStore)
+        self.assertEqual(len(list(blocked.store.blocks())), 9)
+        expected, _ = get_rules(
+            data, "DifferentialEvolution", self.metrics, max_evals=500, seed=1
+        )
+        rules, _ = get_rules(
+            blocked, "DifferentialEvolution", self.metrics, max_evals=500, seed=1
+        )
+        self.assertEqual(
+            [(r.key, r.support, r.confidence) for r in rules],
+            [(r.key, r.support, r.confidence) for r in expected],
+        )
+
+    def test_invalid_block_size(self):
+        with self.assertRaises(ValueError):
+            BlockStore({"a": np.zeros(3)}, block_size=0)
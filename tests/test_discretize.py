@@ -0,0 +1,144 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from niaarm import Dataset, Feature, Rule, RuleList
+from niaarm.preprocessing import discretize, squash, undiscretize
+
+
+class TestDiscretize(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+
+    def test_quantile_bins(self):
+        discretized = discretize(self.data, bins=4)
+        length = discretized.transactions["Length"]
+        self.assertTrue(pd.api.types.is_integer_dtype(length))
+        np.testing.assert_array_equal(np.unique(length), [0, 1, 2, 3])
+        counts = np.bincount(length)
+        self.assertLess(counts.max() - counts.min(), 0.1 * len(length))
+        edges = discretized.bin_edges["Length"]
+        self.assertEqual(len(edges), 5)
+        self.assertEqual(edges[0], self.data.transactions["Length"].min())
+        self.assertEqual(edges[-1], self.data.transactions["Length"].max())
+        self.assertEqual(discretized.features[0], self.data.features[0])
+
+    def test_uniform_bins(self):
+        discretized = discretize(self.data, bins=5, strategy="uniform")
+        np.testing.assert_allclose(
+            discretized.bin_edges["Length"], np.linspace(0.075, 0.815, 6)
+        )
+        values = self.data.transactions["Length"]
+        codes = discretized.transactions["Length"]
+        self.assertTrue((values[codes == 0] < 0.075 + 0.148).all())
+        self.assertTrue((values[codes == 4] >= 0.815 - 0.148).all())
+
+    def test_selected_features(self):
+        discretized = discretize(self.data, bins=3, features=["Rings"])
+        self.assertEqual(list(discretized.bin_edges), ["Rings"])
+        pd.testing.assert_series_equal(
+            discretized.transactions["Length"], self.data.transactions["Length"]
+        )
+        self.assertEqual(discretized.features[-1].max_val, 2)
+
+    def test_weights(self):
+        transactions = pd.DataFrame({"x": [1.0, 2.0, 3.0, 4.0]})
+        unweighted = discretize(Dataset(transactions), bins=2)
+        np.testing.assert_array_equal(unweighted.transactions["x"], [0, 0, 1, 1])
+        data = Dataset(transactions, weights=[3, 1, 1, 3])
+        discretized = discretize(data, bins=2)
+        np.testing.assert_array_equal(discretized.transactions["x"], [0, 1, 1, 1])
+        np.testing.assert_array_equal(discretized.bin_edges["x"], [1.0, 2.0, 4.0])
+        np.testing.assert_array_equal(discretized.weights, data.weights)
+        squashed = squash(discretized, 0.9)
+        self.assertIs(squashed.bin_edges["x"], discretized.bin_edges["x"])
+
+    def test_undiscretize(self):
+        discretized = discretize(self.data, bins=4)
+        edges = discretized.bin_edges["Length"]
+        rings = discretized.bin_edges["Rings"]
+        self.assertTrue(np.issubdtype(rings.dtype, np.integer))
+        antecedent = [
+            Feature("Length", "int", 1, 2),
+            Feature("Sex", "cat", categories=["M"]),
+        ]
+        consequent = [Feature("Rings", "int", 0, 1)]
+        rule = Rule(antecedent, consequent, transactions=discretized.store)
+        (mapped,) = undiscretize(RuleList([rule]), discretized.bin_edges)
+        self.assertEqual(mapped.antecedent[0].dtype, "float")
+        self.assertEqual(mapped.antecedent[0].min_val, edges[1])
+        self.assertEqual(mapped.antecedent[0].max_val, np.nextafter(edges[3], -np.inf))
+        self.assertEqual(mapped.antecedent[1], antecedent[1])
+        self.assertEqual(
+            mapped.consequent[0], Feature("Rings", "int", rings[0], rings[2] - 1)
+        )
+        self.assertEqual(rule.antecedent[0], Feature("Length", "int", 1, 2))
+
+        # the mapped rules cover the same transactions of the original dataset
+        for consequent in (
+            [Feature("Rings", "int", 0, 1)],
+            [Feature("Rings", "int", 2, 3)],
+        ):
+            rule = Rule(antecedent, consequent, transactions=discretized.store)
+            (mapped,) = undiscretize(RuleList([rule]), discretized.bin_edges)
+            expected = Rule(
+                mapped.antecedent, mapped.consequent, transactions=self.data.store
+            )
+            for metric in ("support", "confidence", "coverage", "rhs_support"):
+                self.assertEqual(getattr(mapped, metric), getattr(expected, metric))
+        self.assertEqual(mapped.consequent[0].max_val, rings[-1])
+
+    def test_integer_bins(self):
+        data = Dataset(pd.DataFrame({"x": [1, 2, 2, 3, 7, 8, 9, 10]}))
+        for strategy in ("quantile", "uniform"):
+            discretized = discretize(data, bins=4, strategy=strategy)
+            edges = discretized.bin_edges["x"]
+            self.assertEqual(edges.dtype, np.int64)
+            values = data.transactions["x"].to_numpy()
+            codes = discretized.transactions["x"].to_numpy()
+            for code in np.unique(codes):
+                rule = Rule([Feature("x", "int", code, code)], [], transactions=None)
+                (mapped,) = undiscretize(RuleList([rule]), discretized.bin_edges)
+                item = mapped.antecedent[0]
+                inside = (values >= item.min_val) & (values <= item.max_val)
+                np.testing.assert_array_equal(inside, codes == code)
+
+    def test_constant_feature(self):
+        data = Dataset(pd.DataFrame({"x": [1, 1, 1, 1], "y": [0.5, 1.5, 2.5, 3.5]}))
+        for strategy in ("quantile", "uniform"):
+            discretized = discretize(data, bins=4, strategy=strategy)
+            np.testing.assert_array_equal(discretized.bin_edges["x"], [1, 1])
+            np.testing.assert_array_equal(discretized.transactions["x"], 0)
+            rule = Rule(
+                [Feature("x", "int", 0, 0)],
+                [Feature("y", "int", 0, 3)],
+                transactions=discretized.store,
+            )
+            mapped = undiscretize(RuleList([rule]), discretized.bin_edges)[0]
+            self.assertEqual(mapped.antecedent[0], Feature("x", "int", 1, 1))
+            self.assertEqual(mapped.support, 1.0)
+
+    def test_missing_values(self):
+        data = Dataset(pd.DataFrame({"x": [1.0, np.nan, 2.0, 3.0], "y": list("abab")}))
+        discretized = discretize(data, bins=3)
+        codes = discretized.transactions["x"]
+        self.assertEqual(codes.dtype, pd.Int64Dtype())
+        self.assertEqual(codes.tolist(), [0, pd.NA, 1, 2])
+        self.assertEqual(discretized.features[0], Feature("x", "int", 0, 2))
+        rule = Rule(
+            [Feature("x", "int", 1, 2)],
+            [Feature("y", "cat", categories=["a"])],
+            transactions=discretized.store,
+        )
+        self.assertEqual(rule.antecedent_count, 2)
+        self.assertEqual(squash(discretized, 1.0).weights.sum(), 4)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            discretize(self.data, strategy="kmeans")
+        with self.assertRaises(ValueError):
+            discretize(self.data, bins=0)
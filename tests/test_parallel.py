@@ -0,0 +1,72 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+from niapy.algorithms.basic import DifferentialEvolution
+
+from niaarm import Dataset, NiaARM, get_rules
+from niaarm.parallel import EvaluationPool
+
+
+class TestParallelEvaluation(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.metrics = ("support", "confidence", "amplitude")
+
+    def test_pool_counts_match_serial(self):
+        population = np.random.default_rng(1).uniform(size=(50, self.data.dimension))
+        serial = NiaARM(
+            self.data.dimension, self.data.features, self.data.store, self.metrics
+        )
+        parallel = NiaARM(
+            self.data.dimension, self.data.features, self.data.store, self.metrics
+        )
+
+        expected = serial.evaluate_population(population)
+        with EvaluationPool(parallel.store, 2) as pool:
+            parallel.pool = pool
+            fitness = parallel.evaluate_population(population)
+            fitness_one_by_one = [parallel.evaluate(x) for x in population]
+
+        np.testing.assert_array_equal(fitness, expected)
+        np.testing.assert_array_equal(fitness_one_by_one, expected)
+        self.assertEqual(
+            [repr(rule) for rule in parallel.rules],
+            [repr(rule) for rule in serial.rules],
+        )
+
+    def test_get_rules_is_deterministic(self):
+        serial = get_rules(
+            self.data,
+            DifferentialEvolution(population_size=10, seed=42),
+            self.metrics,
+            max_evals=100,
+        )
+        parallel = get_rules(
+            self.data,
+            DifferentialEvolution(population_size=10, seed=42),
+            self.metrics,
+            max_evals=100,
+            n_jobs=2,
+        )
+        self.assertEqual(
+            [(repr(rule), rule.fitness) for rule in parallel.rules],
+            [(repr(rule), rule.fitness) for rule in serial.rules],
+        )
+
+    def test_weighted_store(self):
+        data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "wiki_test_case.csv"),
+            deduplicate=True,
+        )
+        population = np.random.default_rng(3).uniform(size=(30, data.dimension))
+        serial = NiaARM(data.dimension, data.features, data.store, self.metrics)
+        parallel = NiaARM(data.dimension, data.features, data.store, self.metrics)
+
+        expected = serial.evaluate_population(population)
+        with EvaluationPool(parallel.store, 2) as pool:
+            parallel.pool = pool
+            fitness = parallel.evaluate_population(population)
+        np.testing.assert_array_equal(fitness, expected)
@@ -0,0 +1,87 @@
+import os
+import tempfile
+from importlib.util import find_spec
+from unittest import TestCase, skipUnless
+
+import pandas as pd
+
+from niaarm.dataset import Dataset
+
+HAS_PYARROW = find_spec("pyarrow") is not None
+
+
+class TestColumnProjection(TestCase):
+    def setUp(self):
+        self.path = os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+
+    def test_csv_columns(self):
+        data = Dataset(self.path, columns=["Rings", "Sex"])
+        self.assertEqual(data.header, ["Rings", "Sex"])
+        self.assertEqual([f.dtype for f in data.features], ["int", "cat"])
+
+    def test_dataframe_columns(self):
+        data = Dataset(pd.read_csv(self.path), columns=["Length"])
+        self.assertEqual(data.header, ["Length"])
+        self.assertEqual(data.dimension, 5)
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            Dataset(self.path, file_format="xlsx")
+
+    @skipUnless(not HAS_PYARROW, "pyarrow is installed")
+    def test_missing_pyarrow(self):
+        with self.assertRaises(ImportError):
+            Dataset(self.path, file_format="parquet")
+
+    @skipUnless(not HAS_PYARROW, "pyarrow is installed")
+    def test_upper_case_extension_without_pyarrow(self):
+        with self.assertRaises(ImportError):
+            Dataset("ABALONE.PARQUET")
+
+
+@skipUnless(HAS_PYARROW, "pyarrow is not installed")
+class TestReadArrow(TestCase):
+    def setUp(self):
+        self.expected = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.directory = tempfile.TemporaryDirectory()
+        transactions = pd.read_csv(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.parquet = os.path.join(self.directory.name, "abalone.parquet")
+        transactions.to_parquet(self.parquet)
+        self.feather = os.path.join(self.directory.name, "abalone.feather")
+        transactions.to_feather(self.feather)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_formats(self):
+        for path in (self.parquet, self.feather):
+            data = Dataset(path)
+            self.assertEqual(data.header, self.expected.header)
+            self.assertIsInstance(data.transactions["Sex"].dtype, pd.CategoricalDtype)
+            for feature, expected in zip(
+                data.features, self.expected.features, strict=True
+            ):
+                self.assertEqual(feature, expected)
+                self.assertEqual(feature.categories, expected.categories)
+
+    def test_columns(self):
+        for path in (self.parquet, self.feather):
+            data = Dataset(path, columns=["Sex", "Rings"])
+            self.assertEqual(data.header, ["Sex", "Rings"])
+            self.assertEqual(data.features[1], self.expected.features[-1])
+
+    def test_explicit_format(self):
+        path = os.path.join(self.directory.name, "abalone.data")
+        os.rename(self.parquet, path)
+        data = Dataset(path, file_format="parquet")
+        self.assertEqual(len(data.transactions), len(self.expected.transactions))
+
+    def test_upper_case_extension(self):
+        path = os.path.join(self.directory.name, "ABALONE.PARQUET")
+        os.rename(self.parquet, path)
+        data = Dataset(path)
+        self.assertEqual(len(data.transactions), len(self.expected.transactions))
@@ -7,6 +7,9 @@ borders for numerical attributes.
 import os
 from unittest import TestCase
 
+import numpy as np
+import pandas as pd
+
 from niaarm.dataset import Dataset
 
 
@@ -98,3 +101,43 @@ class TestReadCSVWiki(TestCase):
         self.assertEqual(min_value, minval)
         self.assertEqual(max_value, maxval)
         self.assertEqual(dtypes, dtypes_a)
+
+
+class TestProfile(TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "a": [1, 2, 2, 5],
+                "b": [0.5, np.nan, 0.5, 1.5],
+                "c": ["x", "y", None, "x"],
+                "d": [True, False, True, True],
+            }
+        )
+
+    def test_profile(self):
+        profile = Dataset(self.df).profile
+        self.assertEqual(profile["a"].tolist()[:3], ["int", 1, 5])
+        self.assertEqual(profile["b"].tolist()[:3], ["float", 0.5, 1.5])
+        self.assertEqual(profile["c"]["dtype"], "category")
+        self.assertEqual(profile["c"]["categories"], ["x", "y"])
+        self.assertEqual(profile["d"].tolist()[:3], ["int", 0, 1])
+        self.assertEqual(profile.loc["nulls"].tolist(), [0, 1, 1, 0])
+        self.assertEqual(profile.loc["cardinality"].tolist(), [3, 2, 2, 2])
+
+    def test_weighted_nulls(self):
+        profile = Dataset(self.df, weights=[1, 3, 5, 1]).profile
+        self.assertEqual(profile.loc["nulls"].tolist(), [0, 3, 5, 0])
+
+    def test_same_dtype_ranges(self):
+        df = pd.DataFrame(
+            {
+                "a": np.array([3, 1], dtype=np.int32),
+                "b": [2.5, -1.0],
+                "c": np.array([7, 9], dtype=np.int32),
+            }
+        )
+        features = Dataset(df).features
+        self.assertEqual(
+            [(f.min_val, f.max_val) for f in features], [(1, 3), (-1.0, 2.5), (7, 9)]
+        )
+        self.assertIsInstance(features[0].min_val, np.int32)
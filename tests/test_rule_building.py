@@ -6,9 +6,12 @@ an association rule from candidate solutions.
 import os
 from unittest import TestCase
 
+import numpy as np
+
 from niaarm.dataset import Dataset
 from niaarm.feature import Feature
 from niaarm.niaarm import NiaARM
+from niaarm.rule import Rule
 
 
 class TestBuildRuleA(TestCase):
@@ -154,3 +157,33 @@ class TestBuildRuleA(TestCase):
                 Feature("Feat2", dtype="int", min_val=0, max_val=0),
             ],
         )
+
+
+class TestRuleKey(TestCase):
+    def test_equal_rules_have_equal_keys(self):
+        rule1 = Rule(
+            [Feature("Feat1", dtype="cat", categories=["A", "B"])],
+            [Feature("Feat2", dtype="float", min_val=0.1, max_val=0.3)],
+        )
+        rule2 = Rule(
+            [Feature("Feat1", dtype="cat", categories=["B", "A"])],
+            [Feature("Feat2", dtype="float", min_val=0.1 + 1e-9, max_val=0.3)],
+        )
+        rule3 = Rule(
+            [Feature("Feat1", dtype="cat", categories=["A"])],
+            [Feature("Feat2", dtype="float", min_val=0.1, max_val=0.3)],
+        )
+        self.assertEqual(rule1.key, rule2.key)
+        self.assertNotEqual(rule1.key, rule3.key)
+        self.assertEqual(len({rule1.key, rule2.key, rule3.key}), 2)
+
+    def test_archive_has_no_duplicates(self):
+        data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "wiki_test_case.csv")
+        )
+        problem = NiaARM(data.dimension, data.features, data.transactions, ("support",))
+        vector = np.array([0.45, 0.20, 0.68, 0.78, 0.10, 0.18, 0.50, 0.5])
+        problem.evaluate(vector)
+        problem.evaluate(vector)
+        self.assertEqual(len(problem.rules), 1)
+        self.assertEqual(problem.rule_keys, {problem.rules[0].key})
@@ -0,0 +1,241 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from niaarm import Dataset, Feature, Rule
+from niaarm.preprocessing import squash, squash_csv
+
+
+class TestSquash(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+
+    def test_weights_are_cluster_sizes(self):
+        squashed = squash(self.data, 0.9)
+        self.assertLess(len(squashed.transactions), len(self.data.transactions))
+        self.assertEqual(squashed.weights.sum(), len(self.data.transactions))
+        self.assertEqual(squashed.store.num_transactions, len(self.data.transactions))
+
+    def test_metrics_are_approximated(self):
+        squashed = squash(self.data, 0.9)
+        antecedent = [Feature("Sex", dtype="cat", categories=["M"])]
+        consequent = [Feature("Rings", dtype="int", min_val=5, max_val=12)]
+        rule = Rule(antecedent, consequent, transactions=squashed.store)
+        expected = Rule(antecedent, consequent, transactions=self.data.store)
+        self.assertAlmostEqual(rule.support, expected.support, delta=0.05)
+        self.assertAlmostEqual(rule.confidence, expected.confidence, delta=0.05)
+
+    def test_weighted_input(self):
+        transactions = pd.DataFrame(
+            {"color": ["red", "blue", "blue"], "size": [1.0, 1.1, 2.0]}
+        )
+        data = Dataset(transactions, weights=[5, 1, 1])
+        squashed = squash(data, 0.4)
+        np.testing.assert_array_equal(squashed.weights, [6, 1])
+        self.assertEqual(squashed.transactions["color"][0], "red")
+        self.assertAlmostEqual(squashed.transactions["size"][0], 6.1 / 6)
+
+    def test_identical_transactions(self):
+        path = os.path.join(
+            os.path.dirname(__file__), "test_data", "wiki_test_case.csv"
+        )
+        squashed = squash(Dataset(path), 1.0)
+        deduplicated = Dataset(path, deduplicate=True)
+        np.testing.assert_array_equal(squashed.weights, deduplicated.weights)
+        pd.testing.assert_frame_equal(
+            squashed.transactions,
+            deduplicated.transactions,
+            check_categorical=False,
+        )
+
+    def test_tree_matches_exhaustive(self):
+        for threshold in (0.9, 0.97):
+            exhaustive = squash(self.data, threshold)
+            tree = squash(self.data, threshold, method="tree")
+            pd.testing.assert_frame_equal(tree.transactions, exhaustive.transactions)
+            np.testing.assert_array_equal(tree.weights, exhaustive.weights)
+
+    def test_tree_with_constant_feature(self):
+        transactions = pd.DataFrame(
+            {
+                "color": ["red", "red", "blue", "red"],
+                "size": [1.0, 1.1, 2.0, 1.0],
+                "constant": [3, 3, 3, 3],
+            }
+        )
+        data = Dataset(transactions)
+        exhaustive = squash(data, 0.5)
+        tree = squash(data, 0.5, method="tree")
+        pd.testing.assert_frame_equal(tree.transactions, exhaustive.transactions)
+        np.testing.assert_array_equal(tree.weights, exhaustive.weights)
+
+    def test_tree_without_numerical_features(self):
+        path = os.path.join(
+            os.path.dirname(__file__), "test_data", "wiki_test_case.csv"
+        )
+        data = Dataset(pd.read_csv(path).astype(str))
+        for threshold in (0.3, 1.0):
+            np.testing.assert_array_equal(
+                squash(data, threshold, method="tree").weights,
+                squash(data, threshold).weights,
+            )
+
+    def test_lsh_compares_fewer_pairs(self):
+        path = os.path.join(
+            os.path.dirname(__file__), "test_data", "wiki_test_case.csv"
+        )
+        data = Dataset(path)
+        exhaustive, exhaustive_info = squash(data, 0.99, "cosine", return_info=True)
+        lsh, lsh_info = squash(
+            data, 0.99, "cosine", method="lsh", seed=0, return_info=True
+        )
+        np.testing.assert_array_equal(lsh.weights, exhaustive.weights)
+        self.assertEqual(lsh_info.num_transactions, 7)
+        self.assertEqual(lsh_info.num_clusters, exhaustive_info.num_clusters)
+        self.assertEqual(exhaustive_info.pairs_compared, 11)
+        self.assertLess(lsh_info.pairs_compared, exhaustive_info.pairs_compared)
+
+    def test_lsh_approximates_exhaustive(self):
+        exhaustive = squash(self.data, 0.99, "cosine")
+        lsh = squash(self.data, 0.99, "cosine", method="lsh", seed=0)
+        pd.testing.assert_frame_equal(lsh.transactions, exhaustive.transactions)
+        np.testing.assert_array_equal(lsh.weights, exhaustive.weights)
+
+    def test_lsh_hyperplanes_trade_recall(self):
+        _, few = squash(
+            self.data,
+            0.9,
+            "cosine",
+            method="lsh",
+            num_hyperplanes=4,
+            seed=0,
+            return_info=True,
+        )
+        _, many = squash(
+            self.data,
+            0.9,
+            "cosine",
+            method="lsh",
+            num_hyperplanes=32,
+            seed=0,
+            return_info=True,
+        )
+        self.assertLess(many.pairs_compared, few.pairs_compared)
+        self.assertGreaterEqual(many.num_clusters, few.num_clusters)
+
+    def test_parallel_blocks(self):
+        squashed, info = squash(self.data, 0.9, n_jobs=2, return_info=True)
+        self.assertEqual(squashed.weights.sum(), len(self.data.transactions))
+        self.assertEqual(info.num_clusters, len(squashed.transactions))
+        tree = squash(self.data, 0.9, method="tree", n_jobs=2)
+        pd.testing.assert_frame_equal(tree.transactions, squashed.transactions)
+        np.testing.assert_array_equal(tree.weights, squashed.weights)
+
+    def test_parallel_blocks_compare_fewer_pairs(self):
+        _, serial = squash(self.data, 0.97, return_info=True)
+        _, parallel = squash(self.data, 0.97, n_jobs=4, return_info=True)
+        self.assertLess(parallel.pairs_compared, serial.pairs_compared)
+
+    def test_partition_by(self):
+        # transactions of different sexes are never similar at this threshold
+        expected = squash(self.data, 0.9)
+        squashed = squash(self.data, 0.9, partition_by="Sex")
+        self.assertEqual(len(squashed.transactions), len(expected.transactions))
+        for sex in ("F", "I", "M"):
+            rows = squashed.transactions["Sex"] == sex
+            expected_rows = expected.transactions["Sex"] == sex
+            np.testing.assert_array_equal(
+                squashed.weights[rows], expected.weights[expected_rows]
+            )
+
+    def test_invalid_method(self):
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, method="grid")
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, similarity="cosine", method="tree")
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, method="lsh")
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, n_jobs=0)
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, partition_by="Color")
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, "cosine", method="lsh", num_hyperplanes=65)
+        with self.assertRaises(ValueError):
+            squash(self.data, 0.9, "cosine", method="lsh", num_tables=0)
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            Dataset(pd.DataFrame({"a": [1, 2]}), weights=[1])
+
+
+class TestSquashCsv(TestCase):
+    def setUp(self):
+        self.path = os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        self.data = Dataset(self.path)
+
+    def test_single_chunk_matches_squash(self):
+        for threshold, similarity in ((0.9, "euclidean"), (0.999, "cosine")):
+            expected = squash(self.data, threshold, similarity)
+            squashed = squash_csv(self.path, threshold, similarity)
+            pd.testing.assert_frame_equal(squashed.transactions, expected.transactions)
+            np.testing.assert_array_equal(squashed.weights, expected.weights)
+
+    def test_chunks(self):
+        squashed, info = squash_csv(self.path, 0.9, chunksize=500, return_info=True)
+        self.assertEqual(info.num_transactions, len(self.data.transactions))
+        self.assertEqual(info.num_clusters, len(squashed.transactions))
+        self.assertEqual(squashed.weights.sum(), len(self.data.transactions))
+        self.assertEqual(squashed.header, self.data.header)
+
+    def test_max_prototypes(self):
+        squashed = squash_csv(self.path, 0.9, chunksize=1000, max_prototypes=50)
+        self.assertEqual(len(squashed.transactions), 50)
+        self.assertEqual(squashed.weights.sum(), len(self.data.transactions))
+        antecedent = [Feature("Sex", dtype="cat", categories=["M"])]
+        consequent = [Feature("Rings", dtype="int", min_val=5, max_val=12)]
+        rule = Rule(antecedent, consequent, transactions=squashed.store)
+        expected = Rule(antecedent, consequent, transactions=self.data.store)
+        self.assertAlmostEqual(rule.support, expected.support, delta=0.1)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            squash_csv(self.path, 0.9, similarity="manhattan")
+        with self.assertRaises(ValueError):
+            squash_csv(self.path, 0.9, max_prototypes=0)
+
+    def test_no_transactions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "empty.csv")
+            with open(path, "w") as f:
+                f.write("a,b\n")
+            with self.assertRaises(ValueError):
+                squash_csv(path, 0.9)
+            with self.assertRaises(ValueError):
+                squash(Dataset(path), 0.9)
+
+    def test_constant_feature_in_first_chunk(self):
+        # sorted by group, which is constant in the first chunk
+        rng = np.random.default_rng(0)
+        x = rng.random(200)
+        x[[0, 1]] = [0.0, 1.0]
+        transactions = pd.DataFrame({"x": x, "group": np.repeat([0, 1], 100)})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sorted.csv")
+            transactions.to_csv(path, index=False)
+            expected = squash(Dataset(path), 0.9)
+            squashed = squash_csv(path, 0.9, chunksize=100)
+            pd.testing.assert_frame_equal(squashed.transactions, expected.transactions)
+            np.testing.assert_array_equal(squashed.weights, expected.weights)
+
+            # a row with a missing value beyond max_prototypes joins the
+            # prototype nearest in its other features
+            transactions = pd.DataFrame({"x": [0.0, 1.0, np.nan], "group": [0, 1, 1]})
+            transactions.to_csv(path, index=False)
+            squashed = squash_csv(path, 0.9, max_prototypes=2)
+            np.testing.assert_array_equal(squashed.weights, [1, 2])
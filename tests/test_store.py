@@ -0,0 +1,299 @@
+import os
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from niaarm import Dataset, Feature, Rule
+from niaarm.store import TransactionStore, pack_bits, popcount
+
+
+class TestTransactionStore(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.store = self.data.store
+
+    def test_compiled_columns(self):
+        self.assertEqual(self.store.num_transactions, len(self.data.transactions))
+        self.assertEqual(self.store.num_features, len(self.data.features))
+        self.assertEqual(self.store.columns["Length"].dtype, np.float64)
+        self.assertEqual(self.store.columns["Sex"].dtype, np.int32)
+        self.assertEqual(set(self.store.categories["Sex"]), {"F", "I", "M"})
+
+    def test_item_mask(self):
+        transactions = self.data.transactions
+        item = Feature("Length", dtype="float", min_val=0.2, max_val=0.5)
+        expected = (
+            (transactions["Length"] >= 0.2) & (transactions["Length"] <= 0.5)
+        ).to_numpy()
+        np.testing.assert_array_equal(self.store.item_mask(item), expected)
+
+        item = Feature("Sex", dtype="cat", categories=["M", "F"])
+        expected = transactions["Sex"].isin(["M", "F"]).to_numpy()
+        np.testing.assert_array_equal(self.store.item_mask(item), expected)
+
+    def test_rule_from_store_and_dataframe(self):
+        antecedent = [
+            Feature("Sex", dtype="cat", categories=["M"]),
+            Feature("Rings", dtype="int", min_val=5, max_val=12),
+        ]
+        consequent = [Feature("Height", dtype="float", min_val=0.1, max_val=0.2)]
+        rule_store = Rule(antecedent, consequent, transactions=self.store)
+        rule_df = Rule(antecedent, consequent, transactions=self.data.transactions)
+
+        for metric in Rule.metrics:
+            self.assertEqual(getattr(rule_store, metric), getattr(rule_df, metric))
+
+    def test_rule_compiles_referenced_columns(self):
+        # the unhashable column can't be compiled, so it must be skipped
+        transactions = pd.DataFrame(
+            {
+                "color": ["red", "blue", "red", "red"],
+                "size": [1.0, 2.0, 3.0, 4.0],
+                "tags": [["a"], ["b"], [], ["a", "b"]],
+            }
+        )
+        antecedent = [Feature("color", dtype="cat", categories=["red"])]
+        consequent = [Feature("size", dtype="float", min_val=2.5, max_val=4.0)]
+        rule = Rule(antecedent, consequent, transactions=transactions)
+        self.assertEqual(rule.num_transactions, 4)
+        self.assertEqual(rule.support, 0.5)
+        self.assertEqual(rule.confidence, 2 / 3)
+        self.assertEqual(rule.inclusion, 2 / 3)
+        self.assertEqual(rule.amplitude, 0.75)
+
+    def test_object_column(self):
+        store = TransactionStore(pd.DataFrame({"col": ["a", "b", None, "a"]}))
+        mask = store.item_mask(Feature("col", dtype="cat", categories=["a"]))
+        np.testing.assert_array_equal(mask, [True, False, False, True])
+
+    def test_statistics_from_features(self):
+        computed = TransactionStore(self.data.transactions).statistics
+        statistics = self.store.statistics
+        self.assertEqual(set(statistics.min_values), set(computed.min_values))
+        for name in statistics.min_values:
+            self.assertEqual(statistics.min_values[name], computed.min_values[name])
+            self.assertEqual(statistics.max_values[name], computed.max_values[name])
+
+    def test_amplitude(self):
+        rule = Rule(
+            [Feature("Rings", dtype="int", min_val=1, max_val=15)],
+            [Feature("Sex", dtype="cat", categories=["M"])],
+            transactions=self.store,
+        )
+        self.assertAlmostEqual(rule.amplitude, 1 - 0.5 * (14 / 28))
+
+
+class TestConjunctions(TestCase):
+    def setUp(self):
+        self.data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        self.store = self.data.store
+
+    def naive_counts(self, antecedent, consequent):
+        contains_antecedent = self.store.mask(antecedent)
+        contains_consequent = self.store.mask(consequent)
+        return (
+            np.sum(contains_antecedent),
+            np.sum(contains_consequent),
+            np.sum(contains_antecedent & contains_consequent),
+        )
+
+    def test_item_count(self):
+        items = [
+            Feature("Sex", dtype="cat", categories=["M", "I"]),
+            Feature("Length", dtype="float", min_val=0.3, max_val=0.31),
+            Feature("Rings", dtype="int", min_val=30, max_val=40),
+        ]
+        for item in items:
+            self.assertEqual(
+                self.store.item_count(item), np.sum(self.store.item_mask(item))
+            )
+
+    def test_sparse_and_dense_counts(self):
+        narrow = Feature("Length", dtype="float", min_val=0.3, max_val=0.305)
+        wide = Feature("Rings", dtype="int", min_val=5, max_val=12)
+        male = Feature("Sex", dtype="cat", categories=["M"])
+        height = Feature("Height", dtype="float", min_val=0.1, max_val=0.12)
+        cases = [
+            ([narrow, male], [wide]),
+            ([wide, male, height, Feature("Diameter", "float", 0.2, 0.3)], [wide]),
+            ([wide, male], [narrow]),
+            ([wide, male, height], [Feature("Diameter", "float", 0.2, 0.3)]),
+            ([narrow], [height, male]),
+            ([male], [wide]),
+        ]
+        for antecedent, consequent in cases:
+            self.assertEqual(
+                self.store.counts(antecedent, consequent),
+                self.naive_counts(antecedent, consequent),
+            )
+
+    def test_skip_empty(self):
+        empty = Feature("Rings", dtype="int", min_val=40, max_val=50)
+        consequent = [Feature("Sex", dtype="cat", categories=["M"])]
+        self.assertEqual(
+            self.store.counts([empty], consequent, skip_empty=True), (0, 0, 0)
+        )
+        self.assertEqual(
+            self.store.counts([empty], consequent),
+            self.naive_counts([empty], consequent),
+        )
+
+
+class TestRankIndex(TestCase):
+    def setUp(self):
+        path = os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        self.store = Dataset(path).store
+        self.ranked = Dataset(path, rank_index=True).store
+
+    def test_interval_masks(self):
+        lower = np.array([0.0, 0.2, 0.45, 0.7, 0.3])
+        upper = np.array([1.0, 0.5, 0.46, 0.6, 0.3])
+        np.testing.assert_array_equal(
+            self.ranked.interval_masks("Length", lower, upper),
+            self.store.interval_masks("Length", lower, upper),
+        )
+        for lo, hi in zip(lower, upper, strict=True):
+            np.testing.assert_array_equal(
+                self.ranked.interval_mask("Length", lo, hi),
+                self.store.interval_mask("Length", lo, hi),
+            )
+
+    def test_interval_counts(self):
+        column = self.store.columns["Rings"]
+        self.assertEqual(
+            self.ranked.interval_counts("Rings", 5, 9),
+            np.sum((column >= 5) & (column <= 9)),
+        )
+        np.testing.assert_array_equal(
+            self.ranked.interval_counts("Rings", np.array([3, 10]), np.array([4, 2])),
+            [np.sum((column >= 3) & (column <= 4)), 0],
+        )
+
+    def test_rule_metrics(self):
+        antecedent = [Feature("Length", dtype="float", min_val=0.4, max_val=0.42)]
+        consequent = [Feature("Rings", dtype="int", min_val=5, max_val=12)]
+        rule = Rule(antecedent, consequent, transactions=self.store)
+        ranked = Rule(antecedent, consequent, transactions=self.ranked)
+        for metric in Rule.metrics:
+            self.assertEqual(getattr(ranked, metric), getattr(rule, metric))
+
+
+class TestBitsets(TestCase):
+    def test_pack_and_popcount(self):
+        rng = np.random.default_rng(0)
+        for n in (1, 63, 64, 65, 1000):
+            masks = rng.uniform(size=(3, n)) > 0.5
+            bits = pack_bits(masks)
+            self.assertEqual(bits.dtype, np.uint64)
+            self.assertEqual(bits.shape, (3, (n + 63) // 64))
+            np.testing.assert_array_equal(popcount(bits), masks.sum(axis=1))
+            self.assertEqual(
+                popcount(bits[0] & bits[1]), int((masks[0] & masks[1]).sum())
+            )
+
+
+class TestPrefixBits(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        bins = rng.integers(0, 6, 300).astype(np.float64)
+        bins[[3, 77]] = np.nan
+        self.transactions = pd.DataFrame({"bins": bins, "values": rng.random(300)})
+
+    def test_prefix_bits(self):
+        store = TransactionStore(self.transactions, cache_bytes=0)
+        self.assertIsNone(store.prefix_bits("values"))
+        values, bits = store.prefix_bits("bins")
+        np.testing.assert_array_equal(values, np.arange(6))
+        self.assertEqual(bits.shape, (7, 5))
+        self.assertEqual(popcount(bits[0]), 0)
+        self.assertEqual(popcount(bits[-1]), 298)
+
+    def test_interval_bits(self):
+        lower = np.array([0.0, 1.5, 2.0, 4.0, 5.0, -1.0, 3.0])
+        upper = np.array([5.0, 3.0, 2.0, 3.0, 9.0, 0.5, 3.5])
+        for cache_bytes in (0, 2**20):
+            store = TransactionStore(self.transactions, cache_bytes=cache_bytes)
+            column = self.transactions["bins"].to_numpy()
+            expected = pack_bits(
+                (column >= lower[:, None]) & (column <= upper[:, None])
+            )
+            np.testing.assert_array_equal(
+                store.interval_bits("bins", lower, upper), expected
+            )
+            for j in range(len(lower)):
+                item = Feature("bins", "float", lower[j], upper[j])
+                np.testing.assert_array_equal(store.item_bits(item), expected[j])
+
+    def test_discretized_rule(self):
+        data = Dataset(
+            os.path.join(os.path.dirname(__file__), "test_data", "Abalone.csv")
+        )
+        codes = data.transactions.copy()
+        codes["Rings"] = codes["Rings"] // 4
+        antecedent = [Feature("Rings", "int", 1, 2)]
+        consequent = [Feature("Sex", "cat", categories=["F"])]
+        rule = Rule(antecedent, consequent, transactions=TransactionStore(codes))
+        self.assertIsNotNone(Dataset(codes).store.prefix_bits("Rings"))
+        mask = codes["Rings"].between(1, 2) & (codes["Sex"] == "F")
+        self.assertEqual(rule.full_count, mask.sum())
+
+
+class TestWeights(TestCase):
+    def setUp(self):
+        self.transactions = pd.DataFrame(
+            {
+                "color": pd.Categorical(["red", "red", "blue", "red", "blue", "red"]),
+                "size": [1.0, 1.0, 2.0, 1.0, 3.0, 2.0],
+            }
+        )
+
+    def test_deduplicate(self):
+        data = Dataset(self.transactions.copy(), deduplicate=True)
+        self.assertEqual(len(data.transactions), 4)
+        np.testing.assert_array_equal(data.weights, [3, 1, 1, 1])
+        self.assertEqual(data.store.num_rows, 4)
+        self.assertEqual(data.store.num_transactions, 6)
+
+    def test_weighted_counts_match_duplicated_rows(self):
+        full = Dataset(self.transactions.copy())
+        data = Dataset(self.transactions.copy(), deduplicate=True)
+        antecedent = [Feature("color", dtype="cat", categories=["red"])]
+        consequent = [Feature("size", dtype="float", min_val=1.0, max_val=1.5)]
+        self.assertEqual(
+            data.store.counts(antecedent, consequent),
+            full.store.counts(antecedent, consequent),
+        )
+        rule = Rule(antecedent, consequent, transactions=data.store)
+        expected = Rule(antecedent, consequent, transactions=full.store)
+        for metric in Rule.metrics:
+            self.assertEqual(getattr(rule, metric), getattr(expected, metric))
+        self.assertEqual(data.store.item_count(consequent[0]), 3)
+        self.assertEqual(data.store.count(data.store.bits(antecedent)), 4)
+
+    def test_dataframe_matches_weighted_store(self):
+        data = Dataset(self.transactions.copy(), deduplicate=True)
+        rules = [
+            (
+                [Feature("color", dtype="cat", categories=["red"])],
+                [Feature("size", dtype="float", min_val=1.0, max_val=1.5)],
+            ),
+            (
+                [Feature("size", dtype="float", min_val=1.5, max_val=3.0)],
+                [Feature("color", dtype="cat", categories=["blue"])],
+            ),
+        ]
+        for antecedent, consequent in rules:
+            rule = Rule(antecedent, consequent, transactions=data.store)
+            expected = Rule(antecedent, consequent, transactions=self.transactions)
+            for metric in ("support", "confidence", "coverage", "rhs_support"):
+                self.assertEqual(getattr(rule, metric), getattr(expected, metric))
+        # the unique rows alone don't carry the weights
+        antecedent, consequent = rules[0]
+        weighted = Rule(antecedent, consequent, transactions=data.store)
+        unweighted = Rule(antecedent, consequent, transactions=data.transactions)
+        self.assertNotEqual(unweighted.support, weighted.support)
@@ -81,3 +81,31 @@ class TestTextMining(TestCase):
         self.assertEqual(rule.netconf, 0.8749999999999999)
         self.assertEqual(rule.yulesq, 1.0)
         self.assertEqual(rule.aws, 1.44320067609805)
+
+
+class TestTermDecoding(TestCase):
+    def setUp(self):
+        terms = ["apple", "banana", "cherry", "date"]
+        transactions = pd.DataFrame(
+            [[0.5, 0.0, 0.2, 0.0], [0.0, 0.7, 0.0, 0.1], [0.3, 0.4, 0.0, 0.0]],
+            columns=terms,
+        )
+        self.problem = NiaARTM(3, terms, transactions, ("support", "confidence"))
+        self.serial = NiaARTM(3, terms, transactions, ("support", "confidence"))
+
+    def test_decode(self):
+        vectors = np.array([[0.0, 0.5, 1.0], [0.34, 0.34, 0.99]])
+        np.testing.assert_array_equal(
+            self.problem.decode(vectors), [[0, 1, 3], [1, 1, 2]]
+        )
+
+    def test_build_rule_skips_repeated_terms(self):
+        self.assertEqual(
+            self.problem.build_rule([0.34, 0.34, 0.99]), ["banana", "cherry"]
+        )
+
+    def test_evaluate_population(self):
+        population = np.array([[0.0, 0.5, 1.0, 0.5], [0.34, 0.34, 0.99, 0.1]])
+        fitness = self.problem.evaluate_population(population)
+        expected = [self.serial.evaluate(x) for x in population]
+        np.testing.assert_array_equal(fitness, expected)